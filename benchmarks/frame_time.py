@@ -0,0 +1,248 @@
+"""Time the hot paths of the level in a synthetic world of configurable size.
+
+Run from anywhere, e.g. `python benchmarks/frame_time.py --trees 400 --farm 32 --rain`.
+The world is built from a seeded `random`, so runs with the same arguments are
+comparable across commits. Prints p50/p95/p99 times in ms per stage and the sprite
+counts as JSON.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+sys.path.insert(0, str(ROOT / "code"))
+# pygame greets on stdout when imported, which would break the JSON report
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+from settings import *
+from headless import init_headless
+from controls import ScriptedInput
+from game_map import GameMap
+from assets import assets
+from level import Level
+from soil import NO_SOIL_TILE
+
+# tile layers Level.setup reads, the house, fence and collision layers stay empty
+TILE_LAYERS = [
+    "HouseFloor",
+    "HouseFurnitureBottom",
+    "HouseWalls",
+    "HouseFurnitureTop",
+    "Fence",
+    "Water",
+    "Collision",
+    "Farmable",
+]
+TREE_IMAGES = {
+    "Small": "./graphics/objects/tree_small.png",
+    "Large": "./graphics/objects/tree_medium.png",
+}
+
+
+class SyntheticMap(GameMap):
+    """Stand-in for the Tiled map: an M x M farm, K water tiles and N trees"""
+
+    def __init__(self, trees: int, farm: int, water: int) -> None:
+        tree_side = math.ceil(math.sqrt(trees))
+        water_side = math.ceil(math.sqrt(water))
+
+        # dimensions, with a one tile border around everything
+        self.tile_size = TILE_SIZE
+        self.h_tiles = max(farm, water_side) + tree_side * 2 + 3
+        self.v_tiles = max(farm + water_side + 1, tree_side * 2) + 2
+        self.width = self.h_tiles * TILE_SIZE
+        self.height = self.v_tiles * TILE_SIZE
+
+        # tile layers, gid 1 is a blank tile
+        self.images = {1: pygame.Surface((TILE_SIZE, TILE_SIZE))}
+        self.tile_layers = {
+            layer: [0] * (self.h_tiles * self.v_tiles) for layer in TILE_LAYERS
+        }
+        for y in range(farm):
+            for x in range(farm):
+                self.set_tile("Farmable", x + 1, y + 1)
+        for index in range(water):
+            y, x = divmod(index, water_side)
+            self.set_tile("Water", x + 1, y + farm + 2)
+
+        # object layers, trees use gids from 2 on
+        tree_gids = {}
+        for gid, (name, path) in enumerate(TREE_IMAGES.items(), start=2):
+            tree_gids[name] = gid
+            self.images[gid] = assets.image(path)
+        tree_left = max(farm, water_side) + 2
+        tree_objects = []
+        for index in range(trees):
+            y, x = divmod(index, tree_side)
+            name = random.choice(list(TREE_IMAGES))
+            gid = tree_gids[name]
+            width, height = self.images[gid].get_size()
+            pos = ((tree_left + x * 2) * TILE_SIZE, (y * 2 + 1) * TILE_SIZE)
+            tree_objects.append((name, *pos, width, height, gid))
+        start = ((farm // 2 + 1) * TILE_SIZE, (farm // 2 + 1) * TILE_SIZE)
+        self.object_layers = {
+            "Trees": tree_objects,
+            "Decoration": [],
+            "Player": [("Start", *start, 0, 0, 0)],
+        }
+
+    def set_tile(self, layer: str, x: int, y: int) -> None:
+        self.tile_layers[layer][y * self.h_tiles + x] = 1
+
+
+class Stopwatch:
+    """Wraps methods of an object to add up their time per frame"""
+
+    def __init__(self) -> None:
+        self.frame: dict[str, float] = defaultdict(float)
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def wrap(self, obj, method: str, name: str) -> None:
+        func = getattr(obj, method)
+        frame = self.frame
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            frame[name] += time.perf_counter() - start
+            return result
+
+        setattr(obj, method, timed)
+
+    def time(self, name: str, func, *args) -> None:
+        start = time.perf_counter()
+        func(*args)
+        self.frame[name] += time.perf_counter() - start
+
+    def end_frame(self) -> None:
+        for name, seconds in self.frame.items():
+            self.samples[name].append(seconds * 1000)
+        self.frame.clear()
+
+    def report(self) -> dict[str, dict[str, float]]:
+        report = {}
+        for name, samples in sorted(self.samples.items()):
+            p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+            report[name] = {
+                "count": len(samples),
+                "p50": round(float(p50), 4),
+                "p95": round(float(p95), 4),
+                "p99": round(float(p99), 4),
+            }
+        return report
+
+
+def walk_script(frames: int) -> ScriptedInput:
+    """Walk the player in a square over the farm until the frames run out"""
+    loop = [
+        (60, [pygame.K_RIGHT]),
+        (60, [pygame.K_DOWN]),
+        (60, [pygame.K_LEFT]),
+        (60, [pygame.K_UP]),
+    ]
+    return ScriptedInput(loop * (frames // 240 + 1))
+
+
+def run(
+    trees: int, farm: int, water: int, rain: bool, frames: int, resets: int, seed: int
+) -> dict:
+    random.seed(seed)
+    script = walk_script(frames)
+    game_map = SyntheticMap(trees, farm, water)
+    level = Level(get_pressed=script.get_pressed, game_map=game_map)
+    soil_layer = level.soil_layer
+    # the level rolls the rain, pin it to the config so every run builds the same world
+    level.raining = soil_layer.raining = rain
+
+    # till, water every other cell and plant the farm, timing every hoe hit
+    stopwatch = Stopwatch()
+    for y in range(1, farm + 1):
+        for x in range(1, farm + 1):
+            pos = (x * TILE_SIZE + TILE_SIZE // 2, y * TILE_SIZE + TILE_SIZE // 2)
+            stopwatch.time("get_hit", soil_layer.get_hit, pos)
+            stopwatch.end_frame()
+            if (x + y) % 2:
+                soil_layer.water(pos)
+            soil_layer.plant_seed(pos, random.choice(["corn", "tomato"]))
+
+    stopwatch.wrap(level.all_sprites, "custom_draw", "custom_draw")
+    stopwatch.wrap(level.player, "collision", "collision")
+    stopwatch.wrap(level.rain, "update", "rain_update")
+    stopwatch.wrap(soil_layer, "update_plants", "update_plants")
+
+    # frames
+    dt = 1 / TICK_RATE
+    for _ in range(frames):
+        stopwatch.time("frame", level.run, dt)
+        script.advance()
+        stopwatch.end_frame()
+    sprites = {
+        "all_sprites": len(level.all_sprites),
+        "collision_sprites": len(level.collision_sprites),
+        "tree_sprites": len(level.tree_sprites),
+        "soil_sprites": len(soil_layer.soil_sprites),
+        "water_sprites": len(soil_layer.water_sprites),
+        "plant_sprites": len(soil_layer.plant_sprites),
+    }
+
+    # the daily reset with the rain roll pinned, and a full soil retile from scratch
+    for _ in range(resets):
+        with patch("level.randint", return_value=0 if rain else 9):
+            stopwatch.time("reset", level.reset)
+        for sprite in soil_layer.soil_sprites.sprites():
+            sprite.kill()
+        soil_layer.soil_tiles.clear()
+        soil_layer.tile_codes.fill(NO_SOIL_TILE)
+        stopwatch.time("create_soil_tiles", soil_layer.create_soil_tiles)
+        stopwatch.end_frame()
+
+    return {
+        "config": {
+            "trees": trees,
+            "farm": farm,
+            "water": water,
+            "rain": rain,
+            "frames": frames,
+            "resets": resets,
+            "seed": seed,
+        },
+        "sprites": sprites,
+        "timings_ms": stopwatch.report(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trees", type=int, default=100, help="number of trees")
+    parser.add_argument(
+        "--farm", type=int, default=16, help="side of the farm in tiles"
+    )
+    parser.add_argument("--water", type=int, default=100, help="number of water tiles")
+    parser.add_argument("--rain", action=argparse.BooleanOptionalAction, default=False)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--resets", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    init_headless()
+    result = run(
+        args.trees,
+        args.farm,
+        args.water,
+        args.rain,
+        args.frames,
+        args.resets,
+        args.seed,
+    )
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,61 @@
+"""Time SoilLayer.get_hit while tilling ever larger fields.
+
+Run from anywhere with `python benchmarks/soil_hoe.py`. The cost of one hoe hit and the
+number of soil sprites per tilled cell should stay flat as the field grows.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+sys.path.insert(0, str(ROOT / "code"))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from settings import *
+
+
+class FieldMap:
+    """Stand-in for GameMap: a square farmable field with a one tile border"""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.h_tiles = self.v_tiles = size + 2
+        self.width = self.height = self.h_tiles * TILE_SIZE
+
+    def get_tiles(self, layer: str):
+        field = range(1, self.size + 1)
+        return ((x, y, None) for y in field for x in field)
+
+
+def run(size: int) -> tuple[float, int]:
+    from level import CameraGroup
+    from collision import CollisionGroup
+    from soil import SoilLayer
+    from tint import Tint
+
+    all_sprites = CameraGroup(Tint())
+    field_map = FieldMap(size)
+    soil_layer = SoilLayer(all_sprites, CollisionGroup(), field_map)  # type: ignore
+    start = time.perf_counter()
+    for y in range(1, size + 1):
+        for x in range(1, size + 1):
+            soil_layer.get_hit((x * TILE_SIZE + 1, y * TILE_SIZE + 1))
+    per_hit = (time.perf_counter() - start) / (size * size)
+    return per_hit, len(all_sprites)
+
+
+if __name__ == "__main__":
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    print(f"{'field':>8} {'us/hit':>10} {'sprites':>8} {'sprites/cell':>13}")
+    for size in (8, 16, 32, 64):
+        per_hit, sprites = run(size)
+        per_cell = sprites / size**2
+        print(
+            f"{size:>4}x{size:<3} {per_hit * 1e6:>10.1f} {sprites:>8} {per_cell:>13.2f}"
+        )
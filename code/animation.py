@@ -0,0 +1,36 @@
+class Animation:
+    """A looping frame index that advances at a fixed speed in frames per second.
+
+    Every sprite that shows the animation reads the same index, so the frames of all of
+    them advance with one update.
+    """
+
+    def __init__(self, frame_count: int, speed: float) -> None:
+        self.frame_count = frame_count
+        self.speed = speed
+        self.frame_index = 0.0
+
+    @property
+    def index(self) -> int:
+        return int(self.frame_index)
+
+    def advance(self, dt: float) -> None:
+        self.frame_index += self.speed * dt
+        if self.frame_index >= self.frame_count:
+            self.frame_index = 0
+
+
+class AnimationClock:
+    """The animations shared across sprites, advanced once per tick"""
+
+    def __init__(self) -> None:
+        self.animations: list[Animation] = []
+
+    def add(self, frame_count: int, speed: float) -> Animation:
+        animation = Animation(frame_count, speed)
+        self.animations.append(animation)
+        return animation
+
+    def advance(self, dt: float) -> None:
+        for animation in self.animations:
+            animation.advance(dt)
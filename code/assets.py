@@ -0,0 +1,176 @@
+import os
+from pathlib import Path
+import pygame
+from pygame.mixer import Sound
+from settings import *
+from support import import_folder, import_folder_dict
+from atlas import ATLAS_CACHE_VERSION, TextureAtlas, get_compiled_atlas
+from cache import load_cache
+from game_map import GameMap
+from loader import LoadJob
+from map_cache import MAP_CACHE_VERSION
+from sound_cache import get_compiled_sound
+
+
+class AssetRegistry:
+    """Loads every image and sound once and hands out shared instances.
+
+    Assets are cached by normalised path, so "./graphics/soil/" and "graphics/soil" are
+    the same entry. Images below ATLAS_FOLDERS are handed out as subsurfaces of the
+    packed atlas sheets, which are loaded on first use; other surfaces are converted for
+    the display when they are first loaded. Sounds are built from PCM decoded once into
+    SOUND_CACHE_DIR. Callers get shared objects and must not modify them.
+
+    Every kind of asset also has a `get_*_job` that splits its loading into a decode
+    step for an AssetLoader thread and a finish step that fills the registry on the main
+    thread, so assets can be fetched in parallel before anything asks for them.
+    """
+
+    def __init__(self) -> None:
+        self.atlas: TextureAtlas | None = None
+        self.images: dict[str, pygame.Surface] = {}
+        self.folders: dict[str, list[pygame.Surface]] = {}
+        self.folder_dicts: dict[str, dict[str, pygame.Surface]] = {}
+        self.sounds: dict[str, Sound] = {}
+        self.maps: dict[str, GameMap] = {}
+
+        # statistics
+        self.hits = 0
+        self.misses = 0
+        self.image_bytes = 0
+        self.sound_bytes = 0
+
+    @staticmethod
+    def get_key(path: str | Path) -> str:
+        return os.path.normpath(path)
+
+    def get_atlas(self) -> TextureAtlas:
+        if self.atlas is None:
+            self.add_atlas(get_compiled_atlas(ATLAS_FOLDERS, ATLAS_CACHE_PATH))
+        return self.atlas  # type: ignore
+
+    def add_atlas(self, compiled_atlas: dict) -> None:
+        self.atlas = TextureAtlas(compiled_atlas)
+        self.image_bytes += self.atlas.get_size()
+
+    def get_atlas_job(self) -> LoadJob:
+        # packing converts surfaces, so a missing or outdated cache is packed in finish
+        return LoadJob(
+            lambda: load_cache(ATLAS_CACHE_PATH, ATLAS_CACHE_VERSION),
+            lambda compiled_atlas: self.add_atlas(
+                compiled_atlas or get_compiled_atlas(ATLAS_FOLDERS, ATLAS_CACHE_PATH)
+            ),
+        )
+
+    def image(self, path: str | Path) -> pygame.Surface:
+        key = self.get_key(path)
+        if key in self.images:
+            self.hits += 1
+        else:
+            atlas = self.get_atlas()
+            if key in atlas:
+                self.misses += 1
+                self.images[key] = atlas.get_image(key)
+            else:
+                self.add_image(key, pygame.image.load(key))
+        return self.images[key]
+
+    def add_image(self, key: str, surf: pygame.Surface) -> None:
+        """Convert a decoded image for the display and cache it"""
+        self.misses += 1
+        surf = surf.convert_alpha()
+        self.images[key] = surf
+        self.image_bytes += surf.get_pitch() * surf.get_height()
+
+    def release_image(self, path: str | Path) -> None:
+        """Drop an image nobody needs again, e.g. one that was baked into chunks"""
+        surf = self.images.pop(self.get_key(path), None)
+        if surf and not surf.get_parent():
+            self.image_bytes -= surf.get_pitch() * surf.get_height()
+
+    def get_image_job(self, path: str | Path) -> LoadJob:
+        """Job for an image outside the atlas"""
+        key = self.get_key(path)
+        return LoadJob(
+            lambda: pygame.image.load(key), lambda surf: self.add_image(key, surf)
+        )
+
+    def folder(self, path: str | Path) -> list[pygame.Surface]:
+        """Cached version of `support.import_folder`"""
+        key = self.get_key(path)
+        if key in self.folders:
+            self.hits += 1
+        else:
+            self.folders[key] = import_folder(key, self.image)
+        return self.folders[key]
+
+    def folder_dict(self, path: str | Path) -> dict[str, pygame.Surface]:
+        """Cached version of `support.import_folder_dict`"""
+        key = self.get_key(path)
+        if key in self.folder_dicts:
+            self.hits += 1
+        else:
+            self.folder_dicts[key] = import_folder_dict(key, self.image)
+        return self.folder_dicts[key]
+
+    def sound(self, path: str | Path) -> Sound:
+        key = self.get_key(path)
+        if key in self.sounds:
+            self.hits += 1
+        else:
+            self.add_sound(key, get_compiled_sound(key, SOUND_CACHE_DIR))
+        return self.sounds[key]
+
+    def add_sound(self, key: str, compiled_sound: dict) -> None:
+        self.misses += 1
+        sound = Sound(buffer=compiled_sound["pcm"])
+        self.sounds[key] = sound
+        self.sound_bytes += self.get_sound_size(sound)
+
+    def get_sound_job(self, path: str | Path) -> LoadJob:
+        key = self.get_key(path)
+        return LoadJob(
+            lambda: get_compiled_sound(key, SOUND_CACHE_DIR),
+            lambda compiled_sound: self.add_sound(key, compiled_sound),
+        )
+
+    def game_map(self, path: str = MAP_PATH) -> GameMap:
+        key = self.get_key(path)
+        if key in self.maps:
+            self.hits += 1
+        else:
+            self.add_map(key, None)
+        return self.maps[key]
+
+    def add_map(self, key: str, compiled_map: dict | None) -> None:
+        self.misses += 1
+        self.maps[key] = GameMap(key, MAP_CACHE_PATH, compiled_map)
+
+    def get_map_job(self, path: str = MAP_PATH) -> LoadJob:
+        # compiling converts the tile images, so an outdated map is compiled in finish
+        key = self.get_key(path)
+        return LoadJob(
+            lambda: load_cache(MAP_CACHE_PATH, MAP_CACHE_VERSION),
+            lambda compiled_map: self.add_map(key, compiled_map),
+        )
+
+    @staticmethod
+    def get_sound_size(sound: Sound) -> int:
+        mixer = pygame.mixer.get_init()
+        if not mixer:
+            return 0
+        frequency, size, channels = mixer
+        return int(sound.get_length() * frequency * channels * abs(size) // 8)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "images": len(self.images),
+            "sounds": len(self.sounds),
+            "image_bytes": self.image_bytes,
+            "sound_bytes": self.sound_bytes,
+        }
+
+
+assets = AssetRegistry()
@@ -0,0 +1,118 @@
+import logging
+import os
+from typing import Hashable, TypeVar
+import pygame
+from settings import *
+from support import load_image
+from cache import get_fingerprint, load_cache, write_cache
+
+# bump whenever the layout of the cache changes
+ATLAS_CACHE_VERSION = 1
+
+Key = TypeVar("Key", bound=Hashable)
+
+
+def pack_surfaces(
+    surfaces: dict[Key, pygame.Surface], width: int = ATLAS_WIDTH
+) -> tuple[pygame.Surface, dict[Key, pygame.Rect]]:
+    """Pack surfaces into one atlas surface with a simple shelf packer
+
+    Args:
+        surfaces (dict[Key, pygame.Surface]): surfaces to pack, by key
+        width (int): width of the atlas, widened if a surface does not fit
+
+    Returns:
+        tuple[pygame.Surface, dict[Key, pygame.Rect]]: the atlas and the area of every
+            surface in it
+    """
+    width = max([width] + [surf.get_width() for surf in surfaces.values()])
+
+    # tallest surfaces first, so each shelf wastes little height
+    rects: dict[Key, pygame.Rect] = {}
+    x = y = shelf_height = 0
+    for key in sorted(surfaces, key=lambda key: -surfaces[key].get_height()):
+        surf_width, surf_height = surfaces[key].get_size()
+        if x + surf_width > width:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        rects[key] = pygame.Rect(x, y, surf_width, surf_height)
+        x += surf_width
+        shelf_height = max(shelf_height, surf_height)
+
+    atlas = pygame.Surface((width, max(y + shelf_height, 1)), pygame.SRCALPHA)
+    for key, rect in rects.items():
+        atlas.blit(surfaces[key], rect)
+    return atlas, rects
+
+
+def compile_atlas(roots: list[str]) -> dict:
+    """Pack every image below each root directory into one sheet per root.
+
+    Sheets are stored as raw RGBA bytes, together with the area of each image keyed by
+    its normalised path and the fingerprints of every image and directory.
+    """
+    sources = {}
+    sheets = []
+    rects = {}
+    for root in roots:
+        surfaces = {}
+        for folder, _, files in os.walk(os.path.normpath(root)):
+            sources[folder] = get_fingerprint(folder)
+            for file in files:
+                path = os.path.join(folder, file)
+                sources[path] = get_fingerprint(path)
+                surfaces[path] = load_image(path)
+
+        sheet, sheet_rects = pack_surfaces(surfaces)
+        for path, rect in sheet_rects.items():
+            rects[path] = (len(sheets), tuple(rect))
+        sheets.append((sheet.get_size(), pygame.image.tobytes(sheet, "RGBA")))
+
+    return {
+        "version": ATLAS_CACHE_VERSION,
+        "sources": sources,
+        "sheets": sheets,
+        "rects": rects,
+    }
+
+
+def get_compiled_atlas(roots: list[str], cache_path: str) -> dict:
+    """Return the compiled atlas from the cache, repacking it if any image changed"""
+    compiled_atlas = load_cache(cache_path, ATLAS_CACHE_VERSION)
+    if compiled_atlas is None:
+        logging.info(f"Packing {', '.join(roots)} into {cache_path}")
+        compiled_atlas = compile_atlas(roots)
+        write_cache(compiled_atlas, cache_path)
+    return compiled_atlas
+
+
+class TextureAtlas:
+    """Runtime side of the packed sheets, hands out images as subsurfaces of a sheet"""
+
+    def __init__(self, compiled_atlas: dict) -> None:
+        self.sheets = [
+            pygame.image.frombytes(pixels, size, "RGBA").convert_alpha()
+            for size, pixels in compiled_atlas["sheets"]
+        ]
+        self.images: dict[str, pygame.Surface] = {
+            path: self.sheets[sheet].subsurface(rect)
+            for path, (sheet, rect) in compiled_atlas["rects"].items()
+        }
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.images
+
+    def get_image(self, path: str) -> pygame.Surface:
+        return self.images[path]
+
+    def get_size(self) -> int:
+        """Memory used by the sheets, in bytes"""
+        return sum(sheet.get_pitch() * sheet.get_height() for sheet in self.sheets)
+
+
+if __name__ == "__main__":
+    # pack the sheets ahead of time, e.g. as a build step: python code/atlas.py
+    pygame.display.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    write_cache(compile_atlas(ATLAS_FOLDERS), ATLAS_CACHE_PATH)
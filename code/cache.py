@@ -0,0 +1,63 @@
+from hashlib import sha1
+import logging
+import os
+import pickle
+
+Fingerprint = tuple[int, int, str]
+
+
+def hash_path(path: str) -> str:
+    """Hash the contents of a file, or the listing of a directory"""
+    if os.path.isdir(path):
+        return sha1("\n".join(sorted(os.listdir(path))).encode()).hexdigest()
+    with open(path, "rb") as file:
+        return sha1(file.read()).hexdigest()
+
+
+def get_fingerprint(path: str) -> Fingerprint:
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size, hash_path(path))
+
+
+def is_fresh(sources: dict[str, Fingerprint]) -> bool:
+    """Check source fingerprints, only hashing paths whose mtime or size moved"""
+    for path, (mtime, size, digest) in sources.items():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) != (mtime, size) and hash_path(
+            path
+        ) != digest:
+            return False
+    return True
+
+
+def load_cache(cache_path: str, version: int) -> dict | None:
+    """Load a pickled cache, or None if it is missing, of another version or outdated.
+
+    A cache is a dict with a "version" and the fingerprints of its "sources".
+    """
+    try:
+        with open(cache_path, "rb") as file:
+            data = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    if data.get("version") != version:
+        return None
+    if not is_fresh(data["sources"]):
+        logging.info(f"Cache {cache_path} is outdated")
+        return None
+    return data
+
+
+def write_cache(data: dict, cache_path: str) -> None:
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # write to a temporary file first so a crash never leaves a truncated cache
+        with open(cache_path + ".tmp", "wb") as file:
+            pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError as error:
+        logging.warning(f"Could not write cache {cache_path}: {error}")
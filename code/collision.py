@@ -0,0 +1,60 @@
+import pygame
+from pygame.sprite import Sprite
+from settings import *
+from spatial import SpatialGrid
+
+
+class CollisionGroup(pygame.sprite.Group):
+    """Sprite group that keeps the hitboxes of its sprites in a spatial hash.
+
+    Collision checks only visit the obstacles in the cells a rect overlaps, so their
+    cost does not depend on how many obstacles the map holds. Sprites without a hitbox
+    (for example freshly planted seeds) are ignored until they get one. Any sprite whose
+    hitbox changes has to be passed to `refresh`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.spatial_index = SpatialGrid(COLLISION_CELL_SIZE)
+        # sprites join the group before their hitbox exists, so they are indexed lazily
+        self.pending_sprites: set[Sprite] = set()
+        # obstacles are checked in insertion order to keep collisions deterministic
+        self.collision_order: dict[Sprite, int] = {}
+        self.collision_count = 0
+
+    def add_internal(self, sprite, layer=None) -> None:
+        super().add_internal(sprite, layer)
+        self.pending_sprites.add(sprite)
+        self.collision_order[sprite] = self.collision_count
+        self.collision_count += 1
+
+    def remove_internal(self, sprite) -> None:
+        super().remove_internal(sprite)
+        self.pending_sprites.discard(sprite)
+        self.spatial_index.remove(sprite)
+        del self.collision_order[sprite]
+
+    def refresh(self, sprite) -> None:
+        """Re-index a sprite after its hitbox changed or was created"""
+        if sprite in self.pending_sprites or not hasattr(sprite, "hitbox"):
+            return
+        if sprite in self.spatial_index:
+            self.spatial_index.update(sprite, sprite.hitbox)
+        else:
+            self.spatial_index.insert(sprite, sprite.hitbox)
+
+    def update_index(self) -> None:
+        for sprite in self.pending_sprites:
+            if hasattr(sprite, "hitbox"):
+                self.spatial_index.insert(sprite, sprite.hitbox)  # type: ignore
+        self.pending_sprites.clear()
+
+    def get_nearby(self, rect: pygame.Rect) -> list[Sprite]:
+        """Return the obstacles in the cells the rect overlaps, in insertion order.
+
+        This is a broadphase: the caller still has to test the hitboxes for collision.
+        """
+        self.update_index()
+        return sorted(
+            self.spatial_index.query(rect), key=self.collision_order.__getitem__
+        )
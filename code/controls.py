@@ -0,0 +1,42 @@
+from typing import Callable, Iterable, Sequence
+
+# anything that works like pygame.key.get_pressed: indexed by key, truthy while held
+KeySource = Callable[[], Sequence[bool]]
+
+
+class PressedKeys:
+    """The keys held in one frame, indexed like the result of pygame.key.get_pressed"""
+
+    def __init__(self, keys: Iterable[int] = ()) -> None:
+        self.keys = frozenset(keys)
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.keys
+
+
+class ScriptedInput:
+    """Replays a script of held keys in place of the keyboard.
+
+    The script is a list of (frames, keys) steps, holding the keys for that many frames.
+    `advance` moves to the next frame; once the script ends no keys are held.
+    """
+
+    def __init__(self, script: Iterable[tuple[int, Iterable[int]]]) -> None:
+        self.frames: list[PressedKeys] = []
+        for frames, keys in script:
+            pressed = PressedKeys(keys)
+            self.frames.extend([pressed] * frames)
+        self.frame = 0
+        self.released = PressedKeys()
+
+    @property
+    def finished(self) -> bool:
+        return self.frame >= len(self.frames)
+
+    def advance(self) -> None:
+        self.frame += 1
+
+    def get_pressed(self) -> PressedKeys:
+        if self.finished:
+            return self.released
+        return self.frames[self.frame]
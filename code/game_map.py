@@ -0,0 +1,65 @@
+from typing import Iterator, NamedTuple
+import pygame
+from settings import *
+from map_cache import get_compiled_map
+
+
+class MapObject(NamedTuple):
+    name: str | None
+    x: float
+    y: float
+    width: float
+    height: float
+    image: pygame.Surface | None
+
+
+class GameMap:
+    """The Tiled map, shared by every subsystem that needs map data.
+
+    The map is loaded from a compiled cache that is rebuilt whenever map.tmx, its
+    tilesets or their images change, so a normal start never parses XML. Layers are
+    looked up by name and the map dimensions come from the TMX metadata. A
+    `compiled_map` that was already read from the cache, e.g. by an AssetLoader, skips
+    the cache lookup.
+    """
+
+    def __init__(
+        self,
+        tmx_path: str = MAP_PATH,
+        cache_path: str = MAP_CACHE_PATH,
+        compiled_map: dict | None = None,
+    ) -> None:
+        compiled_map = compiled_map or get_compiled_map(tmx_path, cache_path)
+
+        # dimensions
+        self.tile_size, tile_height = compiled_map["tile_size"]
+        self.h_tiles, self.v_tiles = compiled_map["size"]
+        self.width = self.h_tiles * self.tile_size
+        self.height = self.v_tiles * tile_height
+
+        # layers
+        self.tile_layers: dict[str, list[int]] = compiled_map["tile_layers"]
+        self.object_layers: dict[str, list[tuple]] = compiled_map["object_layers"]
+
+        # tile images, as subsurfaces of the atlas
+        atlas_data = compiled_map["atlas"]
+        atlas = pygame.image.frombytes(
+            atlas_data["pixels"], atlas_data["size"], "RGBA"
+        ).convert_alpha()
+        self.images: dict[int, pygame.Surface] = {
+            gid: atlas.subsurface(rect) for gid, rect in atlas_data["rects"].items()
+        }
+
+    def get_tiles(self, layer: str) -> Iterator[tuple[int, int, pygame.Surface]]:
+        """Yield the (x, y, surface) of every tile in a layer, in tile coordinates"""
+        for index, gid in enumerate(self.tile_layers[layer]):
+            if gid:
+                y, x = divmod(index, self.h_tiles)
+                yield x, y, self.images[gid]
+
+    def get_objects(self, layer: str) -> list[MapObject]:
+        """Return the objects of an object layer"""
+        return [
+            MapObject(name, x, y, width, height, self.images.get(gid))
+            for name, x, y, width, height, gid in self.object_layers[layer]
+        ]
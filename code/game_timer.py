@@ -1,26 +1,84 @@
+from heapq import heappop, heappush
+from itertools import count
 from typing import Callable
-import pygame
+
+
+class ScheduledEvent:
+    """A callback waiting in a Scheduler, cancelled events stay in the heap until due"""
+
+    __slots__ = ("deadline", "callback", "cancelled")
+
+    def __init__(self, deadline: float, callback: Callable[[], None]) -> None:
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class Scheduler:
+    """Simulation time in ms and a min-heap of deadlines on it.
+
+    Time only moves in `advance`, by the dt of every tick, which then fires the
+    callbacks that are due in deadline order. Timers therefore read no wall clock, pause
+    whenever their scheduler is not advanced and behave the same when the level runs
+    faster than real time, e.g. headless with a fixed dt.
+    """
+
+    def __init__(self) -> None:
+        self.ticks = 0.0
+        self.events: list[tuple[float, int, ScheduledEvent]] = []
+        self.order = count()
+
+    def get_ticks(self) -> float:
+        return self.ticks
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> ScheduledEvent:
+        """Call `callback` once `delay` ms have passed"""
+        event = ScheduledEvent(self.ticks + delay, callback)
+        heappush(self.events, (event.deadline, next(self.order), event))
+        return event
+
+    def advance(self, dt: float) -> None:
+        self.ticks += dt * 1000
+        events = self.events
+        while events and events[0][0] <= self.ticks:
+            event = heappop(events)[2]
+            if not event.cancelled:
+                event.callback()
+
+    def __len__(self) -> int:
+        return len(self.events)
 
 
 class Timer:
-    def __init__(self, duration: float, func: Callable[[], None] | None = None) -> None:
+    def __init__(
+        self,
+        duration: float,
+        func: Callable[[], None] | None = None,
+        *,
+        scheduler: Scheduler,
+    ) -> None:
         self.duration = duration
         self.func = func
-        self.start_time = 0
+        self.scheduler = scheduler
+        self.event: ScheduledEvent | None = None
         self.active = False
 
     def activate(self) -> None:
+        if self.event:
+            self.event.cancel()
         self.active = True
-        self.start_time = pygame.time.get_ticks()
+        self.event = self.scheduler.schedule(self.duration, self.expire)
 
     def deactivate(self) -> None:
+        if self.event:
+            self.event.cancel()
+            self.event = None
         self.active = False
-        self.start_time = 0
-
-    def update(self) -> None:
-        current_time = pygame.time.get_ticks()
-        if current_time - self.start_time >= self.duration:
-            if self.start_time != 0:
-                if self.func:
-                    self.func()
-                self.deactivate()
+
+    def expire(self) -> None:
+        if self.func:
+            self.func()
+        self.deactivate()
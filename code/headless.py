@@ -0,0 +1,97 @@
+"""Run the level without a window or sound card, as fast as possible with a fixed dt.
+
+Meant for load and soak tests and economy simulations on CI boxes, e.g.
+    python code/headless.py --frames 36000 --seed 1
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+# pygame greets on stdout when imported, which would break the JSON stats
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from settings import *
+from controls import ScriptedInput
+from level import Level
+from profiler import profiler
+
+
+def init_headless() -> pygame.Surface:
+    """Start pygame on the SDL dummy drivers and open an off-screen display surface"""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.init()
+    return pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+
+class HeadlessGame:
+    """Drives a Level frame by frame with scripted input instead of the Game loop"""
+
+    def __init__(
+        self,
+        script: ScriptedInput | None = None,
+        render: bool = False,
+        dt: float = 1 / 60,
+        seed: int | None = None,
+    ) -> None:
+        init_headless()
+        if seed is not None:
+            random.seed(seed)
+
+        self.script = script or ScriptedInput([])
+        self.dt = dt
+        self.frames = 0
+        self.level = Level(get_pressed=self.script.get_pressed, render=render)
+
+    def step(self) -> None:
+        with profiler.scope("frame"):
+            pygame.event.pump()
+            self.level.run(self.dt)
+        profiler.end_frame()
+        self.script.advance()
+        self.frames += 1
+
+    def run(self, frames: int) -> None:
+        for _ in range(frames):
+            self.step()
+
+    def stats(self) -> dict:
+        player = self.level.player
+        return {
+            "frames": self.frames,
+            "simulated_seconds": round(self.frames * self.dt, 3),
+            "money": player.money,
+            "items": dict(player.item_inventory),
+            "seeds": dict(player.seed_inventory),
+            "sprites": len(self.level.all_sprites),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=3600)
+    parser.add_argument("--dt", type=float, default=1 / 60)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--render", action="store_true", help="draw every frame")
+    parser.add_argument(
+        "--profile", help="export the last frames to a .csv or .json file"
+    )
+    args = parser.parse_args()
+
+    game = HeadlessGame(render=args.render, dt=args.dt, seed=args.seed)
+    if args.profile:
+        profiler.toggle()
+    start = time.perf_counter()
+    game.run(args.frames)
+    elapsed = time.perf_counter() - start
+
+    stats = game.stats()
+    stats["elapsed_seconds"] = round(elapsed, 3)
+    stats["frames_per_second"] = round(args.frames / elapsed, 1)
+    if args.profile:
+        profiler.export(args.profile)
+    print(json.dumps(stats, indent=2))
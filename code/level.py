@@ -1,66 +1,130 @@
+from typing import Callable
 import pygame
 from settings import *
 from player import Player
 from overlay import Overlay
-from sprites import Generic, Interaction, Water, WildFlower, Tree, Particle
-from pytmx.util_pygame import load_pygame
+from sprites import Generic, Interaction, WildFlower, Tree, Particle
+from game_map import GameMap
 from support import *
 from transition import Transition
+from tint import Tint
+from controls import KeySource
+from game_timer import Scheduler
+from profiler import profiler
 from soil import SoilLayer
 from sky import Rain, Sky
 from random import randint
 from menu import Menu
 from sound import SoundManager
 from pathlib import Path
+import logging
+from spatial import SpatialGrid
+from assets import assets
+from collision import CollisionGroup
+from static_layer import AnimatedLayer, StaticLayer
+from animation import AnimationClock
+from loader import LoadJob
 
 
 class Level:
-    def __init__(self) -> None:
+    """The game world and its update loop.
+
+    `get_pressed` replaces the keyboard, e.g. with a ScriptedInput, and with `render`
+    off the level only simulates, which is what headless runs use. `game_map` replaces
+    the Tiled map, e.g. with a synthetic world for benchmarks.
+    """
+
+    def __init__(
+        self,
+        get_pressed: KeySource = pygame.key.get_pressed,
+        render: bool = True,
+        game_map: GameMap | None = None,
+    ) -> None:
         # get the display surface
         self.display_surface = pygame.display.get_surface()
+        self.get_pressed = get_pressed
+        self.render = render
+
+        # clocks of the game world, paused while the shop is open
+        self.scheduler = Scheduler()
+        self.animations = AnimationClock()
+        # clock of the menus, which keep running while the world is paused
+        self.interface_scheduler = Scheduler()
+
+        # day and night tint
+        self.tint = Tint()
 
         # sprite groups
-        self.all_sprites = CameraGroup()
-        self.collision_sprites = pygame.sprite.Group()
+        self.all_sprites = CameraGroup(self.tint)
+        self.collision_sprites = CollisionGroup()
         self.tree_sprites = pygame.sprite.Group()
         self.interaction_sprites = pygame.sprite.Group()
+        # sprites with work of their own every tick, the rest of the world never updates
+        self.active_sprites = pygame.sprite.Group()
         
         # sounds
-        sound_path = Path("audio")
-        self.sound_manager = SoundManager(sound_path)
+        self.sound_manager = SoundManager(Path(AUDIO_PATH), self.interface_scheduler)
 
-        self.soil_layer = SoilLayer(self.all_sprites, self.collision_sprites)
+        # map
+        self.game_map = game_map or assets.game_map()
+
+        self.soil_layer = SoilLayer(
+            self.all_sprites, self.collision_sprites, self.game_map
+        )
         self.setup()
 
         self.overlay = Overlay(self.player)
-        self.transition = Transition(self.reset, self.player)
+        self.transition = Transition(self.reset, self.player, self.tint)
 
         # sky
-        self.sky = Sky()
-        self.rain = Rain(self.all_sprites)
+        self.sky = Sky(self.tint)
+        self.rain = Rain(self.all_sprites, self.game_map)
         self.raining = randint(0, 9) < 3
         self.soil_layer.raining = self.raining
 
+        # profiling
+        profiler.add_counter("sprites", lambda: len(self.all_sprites))
+        profiler.add_counter("collision sprites", lambda: len(self.collision_sprites))
+        profiler.add_counter("plants", lambda: len(self.soil_layer.plant_sprites))
+
         # shop
-        self.menu = Menu(self.player, self.toggle_shop)
+        self.menu = Menu(
+            self.player, self.toggle_shop, self.interface_scheduler, self.get_pressed
+        )
         self.shop_active = False
 
+    @staticmethod
+    def get_load_jobs() -> list[LoadJob]:
+        """Everything building the level reads from disk, to load ahead in parallel"""
+        images = [
+            "./graphics/world/ground.png",
+            *Path("./graphics/stumps").glob("*.png"),
+            *Path("./graphics/overlay").glob("*.png"),
+        ]
+        sounds = [
+            path
+            for name, path in SoundManager.find_audio_files(Path(AUDIO_PATH)).items()
+            if name not in MUSIC_TRACKS
+        ]
+        return [
+            assets.get_map_job(),
+            assets.get_atlas_job(),
+            *(assets.get_image_job(path) for path in images),
+            *(assets.get_sound_job(path) for path in sounds),
+        ]
+
     def setup(self) -> None:
         #TODO Clarify the seaparation between __init__ and setup
-        tmx_data = load_pygame("./data/map.tmx")
-
         # house
+        house_bottom = StaticLayer()
         for layer in ["HouseFloor", "HouseFurnitureBottom"]:
-            for x, y, surf in tmx_data.get_layer_by_name(layer).tiles():
-                Generic(
-                    (x * TILE_SIZE, y * TILE_SIZE),
-                    surf,
-                    self.all_sprites,
-                    LAYERS["house bottom"],
-                )
+            for x, y, surf in self.game_map.get_tiles(layer):
+                house_bottom.add((x * TILE_SIZE, y * TILE_SIZE), surf)
+        house_bottom.bake(self.all_sprites, LAYERS["house bottom"])
 
+        # walls, furniture and fences are y-sorted against the player, so stay sprites
         for layer in ["HouseWalls", "HouseFurnitureTop"]:
-            for x, y, surf in tmx_data.get_layer_by_name(layer).tiles():
+            for x, y, surf in self.game_map.get_tiles(layer):
                 Generic(
                     (x * TILE_SIZE, y * TILE_SIZE),
                     surf,
@@ -69,7 +133,7 @@ class Level:
                 )
 
         # fence
-        for x, y, surf in tmx_data.get_layer_by_name("Fence").tiles():
+        for x, y, surf in self.game_map.get_tiles("Fence"):
             Generic(
                 (x * TILE_SIZE, y * TILE_SIZE),
                 surf,
@@ -77,29 +141,33 @@ class Level:
                 LAYERS["main"],
             )
 
-        # water
-        water_frames = import_folder("./graphics/water")
-        for x, y, surf in tmx_data.get_layer_by_name("Water").tiles():
-            Water((x * TILE_SIZE, y * TILE_SIZE), water_frames, self.all_sprites)
+        # water, baked into chunks that flip frames with one shared animation
+        water_frames = assets.folder("./graphics/water")
+        water = AnimatedLayer(WATER_CHUNK_SIZE)
+        for x, y, surf in self.game_map.get_tiles("Water"):
+            water.add((x * TILE_SIZE, y * TILE_SIZE), water_frames)
+        water_animation = self.animations.add(len(water_frames), speed=5)
+        water.bake(self.all_sprites, LAYERS["water"], water_animation)
 
         # trees
-        for obj in tmx_data.get_layer_by_name("Trees"):
+        for obj in self.game_map.get_objects("Trees"):
             Tree(
                 pos=(obj.x, obj.y),
                 surf=obj.image,
                 groups=[self.all_sprites, self.collision_sprites, self.tree_sprites],
                 name=obj.name,
                 player_add=self.player_add,
+                scheduler=self.scheduler,
             )
 
         # wildflowers
-        for obj in tmx_data.get_layer_by_name("Decoration"):
+        for obj in self.game_map.get_objects("Decoration"):
             WildFlower(
                 (obj.x, obj.y), obj.image, [self.all_sprites, self.collision_sprites]
             )
 
         # collision tiles
-        for x, y, surf in tmx_data.get_layer_by_name("Collision").tiles():
+        for x, y, surf in self.game_map.get_tiles("Collision"):
             Generic(
                 (x * TILE_SIZE, y * TILE_SIZE),
                 pygame.Surface((TILE_SIZE, TILE_SIZE)),
@@ -107,17 +175,19 @@ class Level:
             )
 
         # player
-        for obj in tmx_data.get_layer_by_name("Player"):
+        for obj in self.game_map.get_objects("Player"):
             if obj.name == "Start":
                 self.player = Player(
                     pos=(obj.x, obj.y),
-                    group=self.all_sprites,
+                    group=[self.all_sprites, self.active_sprites],
                     collision_sprites=self.collision_sprites,
                     tree_sprites=self.tree_sprites,
                     interaction=self.interaction_sprites,
                     soil_layer=self.soil_layer,
                     toggle_shop=self.toggle_shop,
                     sound_manager=self.sound_manager,
+                    scheduler=self.scheduler,
+                    get_pressed=self.get_pressed,
                 )
             if obj.name == "Bed":
                 Interaction(
@@ -135,17 +205,17 @@ class Level:
                     obj.name,
                 )
 
-        # ground
-        Generic(
-            pos=(0, 0),
-            surf=pygame.image.load("./graphics/world/ground.png").convert_alpha(),
-            groups=self.all_sprites,
-            z=LAYERS["ground"],
-        )
+        # ground, the chunks are its only copy once baked
+        ground = StaticLayer()
+        ground.add((0, 0), assets.image("./graphics/world/ground.png"))
+        ground.bake(self.all_sprites, LAYERS["ground"])
+        assets.release_image("./graphics/world/ground.png")
 
         # background music
         self.sound_manager.play_indefinite("music")
 
+        logging.info(f"Loaded assets: {assets.stats()}")
+
     def player_add(self, item: str, amount: int = 1):
         self.player.item_inventory[item] += amount
         self.sound_manager.play_once("success")
@@ -177,53 +247,230 @@ class Level:
         if not self.soil_layer.plant_sprites:
             return
 
-        for plant in self.soil_layer.plant_sprites.sprites():
+        for plant in self.soil_layer.get_plants(self.player.hitbox):
             if plant.harvestable and plant.rect.colliderect(self.player.hitbox):  # type: ignore
-                self.player_add(plant.plant_type)  # type: ignore
-                plant.kill()
-                Particle(pos=plant.rect.topleft, surf=plant.image, groups=self.all_sprites, z=LAYERS["main"])  # type: ignore
-                x, y = self.soil_layer.get_sprite_grid_coord(plant)
-                self.soil_layer.grid[y][x].remove("P")
+                self.player_add(plant.plant_type)
+                self.soil_layer.remove_plant(plant)
+                Particle(
+                    pos=plant.rect.topleft,  # type: ignore
+                    surf=plant.image,
+                    groups=self.all_sprites,
+                    z=LAYERS["main"],
+                    scheduler=self.scheduler,
+                )
 
-    def run(self, dt: float) -> None:
-        # drawing logic
-        self.display_surface.fill("black")
-        self.all_sprites.custom_draw(self.player)
+    def update(self, dt: float) -> None:
+        """Advance the simulation by one tick"""
+        self.interface_scheduler.advance(dt)
+        if not self.shop_active:
+            self.scheduler.advance(dt)
+            self.animations.advance(dt)
+        self.all_sprites.save_positions()
 
-        # updates
         if self.shop_active:
-            self.menu.update()
+            with profiler.scope("menu"):
+                self.menu.input()
         else:
-            self.all_sprites.update(dt)
-            self.plant_collision()
-
-        # weather
-        self.overlay.display()
-        if self.raining and not self.shop_active:
-            self.rain.update()
+            with profiler.scope("sprites"):
+                self.active_sprites.update(dt)
+            with profiler.scope("plant collision"):
+                self.plant_collision()
+
+        # weather, the rain is only for show
+        if self.render and not self.shop_active:
+            with profiler.scope("rain"):
+                self.rain.update(dt, self.raining)
         self.sky.display(dt)
 
         # transition overlay
         if self.player.sleep:
-            self.transition.play()
+            with profiler.scope("transition"):
+                self.transition.play()
+
+    def draw(self, alpha: float = 1.0) -> None:
+        """Draw the world, `alpha` of the way from the previous tick to the last one"""
+        with profiler.scope("world"):
+            self.display_surface.fill("black")
+            self.all_sprites.custom_draw(self.player, alpha)
+        with profiler.scope("interface"):
+            if self.shop_active:
+                self.menu.display()
+            self.overlay.display()
+        with profiler.scope("tint"):
+            self.tint.apply()
+
+    def run(self, dt: float) -> None:
+        self.update(dt)
+        if self.render:
+            self.draw()
+
+
+# draws onto the display surface given the camera offset and the world space camera rect
+Renderer = Callable[[pygame.Surface, pygame.math.Vector2, pygame.Rect], None]
+
+
+class RenderLayer:
+    """The sprites of one z layer, indexed by position and kept in draw order.
+
+    Sprites are drawn by (centery, insertion order). The key is taken once when a sprite
+    is added, so static sprites keep a fixed order; on y-sorted layers it is refreshed
+    whenever the sprite moves. The sorted visible list is cached and only rebuilt when
+    the layer changes or the camera crosses into other cells.
+
+    Renderers draw things that are not sprites, such as particles, on top of the sprites
+    of the layer.
+    """
+
+    def __init__(self, y_sort: bool) -> None:
+        self.y_sort = y_sort
+        self.spatial_index = SpatialGrid(SPATIAL_CELL_SIZE)
+        self.sort_keys: dict[pygame.sprite.Sprite, tuple[int, int]] = {}
+        self.version = 0
+        self.renderers: list[Renderer] = []
+
+        # visible sprites of the last draw
+        self.cache_key: tuple | None = None
+        self.cached_sprites: list[pygame.sprite.Sprite] = []
+
+    def add(self, sprite, order: int) -> None:
+        self.spatial_index.insert(sprite, sprite.rect)
+        self.sort_keys[sprite] = (sprite.rect.centery, order)
+        self.version += 1
+
+    def remove(self, sprite) -> None:
+        self.spatial_index.remove(sprite)
+        del self.sort_keys[sprite]
+        self.version += 1
+
+    def move(self, sprite) -> None:
+        changed = self.spatial_index.update(sprite, sprite.rect)
+        if self.y_sort:
+            centery, order = self.sort_keys[sprite]
+            if centery != sprite.rect.centery:
+                self.sort_keys[sprite] = (sprite.rect.centery, order)
+                changed = True
+        if changed:
+            self.version += 1
+
+    def visible_sprites(self, camera_rect: pygame.Rect) -> list[pygame.sprite.Sprite]:
+        cache_key = (self.spatial_index.get_cell_range(camera_rect), self.version)
+        if cache_key != self.cache_key:
+            self.cache_key = cache_key
+            self.cached_sprites = sorted(
+                self.spatial_index.query(camera_rect), key=self.sort_keys.__getitem__
+            )
+        return self.cached_sprites
 
 
 class CameraGroup(pygame.sprite.Group):
-    def __init__(self) -> None:
+    """Sprite group that draws its sprites layer by layer, culled to the camera.
+
+    Sprites are bucketed by z into a RenderLayer each. Sprites with a truthy `dynamic`
+    attribute are re-indexed every frame; any other sprite that changes its rect or z
+    has to be passed to `refresh`.
+    """
+
+    def __init__(self, tint: Tint) -> None:
         super().__init__()
         self.display_surface = pygame.display.get_surface()
         self.offset = pygame.math.Vector2()
+        self.tint = tint
+
+        # render layers
+        self.layers = {z: RenderLayer(z in Y_SORT_LAYERS) for z in LAYERS.values()}
+        self.sprite_layers: dict[pygame.sprite.Sprite, int] = {}
+        # sprites join the group before their rect exists, so they are indexed lazily
+        self.pending_sprites: set[pygame.sprite.Sprite] = set()
+        self.dynamic_sprites: set[pygame.sprite.Sprite] = set()
+        # insertion order breaks ties between sprites with the same centery
+        self.draw_order: dict[pygame.sprite.Sprite, int] = {}
+        self.draw_count = 0
+        # centers of the dynamic sprites before the last tick, to interpolate from
+        self.previous_centers: dict[pygame.sprite.Sprite, tuple[int, int]] = {}
+
+    def add_internal(self, sprite, layer=None) -> None:
+        super().add_internal(sprite, layer)
+        self.pending_sprites.add(sprite)
+        self.draw_order[sprite] = self.draw_count
+        self.draw_count += 1
+
+    def remove_internal(self, sprite) -> None:
+        super().remove_internal(sprite)
+        self.pending_sprites.discard(sprite)
+        self.dynamic_sprites.discard(sprite)
+        if sprite in self.sprite_layers:
+            self.layers[self.sprite_layers.pop(sprite)].remove(sprite)
+        self.previous_centers.pop(sprite, None)
+        del self.draw_order[sprite]
+
+    def add_renderer(self, z: int, renderer: Renderer) -> None:
+        """Draw something that is not a sprite on a layer, e.g. a particle system"""
+        self.layers[z].renderers.append(renderer)
+
+    def refresh(self, sprite) -> None:
+        """Re-index a sprite after its rect or z changed"""
+        z = self.sprite_layers.get(sprite)
+        if z is None:
+            return
+        if z == sprite.z:
+            self.layers[z].move(sprite)
+        else:
+            self.layers[z].remove(sprite)
+            self.layers[sprite.z].add(sprite, self.draw_order[sprite])
+            self.sprite_layers[sprite] = sprite.z
+
+    def update_index(self) -> None:
+        for sprite in self.pending_sprites:
+            self.layers[sprite.z].add(sprite, self.draw_order[sprite])  # type: ignore
+            self.sprite_layers[sprite] = sprite.z  # type: ignore
+            if getattr(sprite, "dynamic", False):
+                self.dynamic_sprites.add(sprite)
+        self.pending_sprites.clear()
+
+        for sprite in self.dynamic_sprites:
+            self.refresh(sprite)
+
+    def get_camera_rect(self) -> pygame.Rect:
+        """Area of the world shown on screen, as of the last draw"""
+        return pygame.Rect(
+            round(self.offset.x), round(self.offset.y), SCREEN_WIDTH, SCREEN_HEIGHT
+        )
 
-    def custom_draw(self, player) -> None:
-        self.offset.x = player.rect.centerx - SCREEN_WIDTH / 2
-        self.offset.y = player.rect.centery - SCREEN_HEIGHT / 2
-
-        for layer in LAYERS.values():
-            for sprite in sorted(self.sprites(), key=lambda sprite: sprite.rect.centery):  # type: ignore
-                if sprite.z == layer:  # type: ignore
-                    offset_rect = sprite.rect.copy()  # type: ignore
-                    offset_rect.center -= self.offset  # type: ignore
-                    self.display_surface.blit(sprite.image, offset_rect)  # type: ignore
+    def save_positions(self) -> None:
+        """Remember where the dynamic sprites are before a tick"""
+        for sprite in self.dynamic_sprites:
+            self.previous_centers[sprite] = sprite.rect.center  # type: ignore
+
+    def get_centers(self, alpha: float) -> dict[pygame.sprite.Sprite, tuple[int, int]]:
+        """Centers of the dynamic sprites, `alpha` of the way since the last tick"""
+        centers = {}
+        for sprite, (x, y) in self.previous_centers.items():
+            current_x, current_y = sprite.rect.center  # type: ignore
+            centers[sprite] = (
+                round(x + (current_x - x) * alpha),
+                round(y + (current_y - y) * alpha),
+            )
+        return centers
+
+    def custom_draw(self, player, alpha: float = 1.0) -> None:
+        centers = self.get_centers(alpha) if alpha < 1 else {}
+        player_x, player_y = centers.get(player, player.rect.center)
+        self.offset.x = player_x - SCREEN_WIDTH / 2
+        self.offset.y = player_y - SCREEN_HEIGHT / 2
+
+        self.update_index()
+        camera_rect = self.get_camera_rect()
+
+        for layer in self.layers.values():
+            for sprite in layer.visible_sprites(camera_rect):
+                offset_rect = sprite.rect.copy()  # type: ignore
+                if sprite in centers:
+                    offset_rect.center = centers[sprite]
+                offset_rect.center -= self.offset  # type: ignore
+                image = self.tint.get_image(sprite.image)  # type: ignore
+                self.display_surface.blit(image, offset_rect)
+            for renderer in layer.renderers:
+                renderer(self.display_surface, self.offset, camera_rect)
 
         # # analytics
         #             if sprite == player:
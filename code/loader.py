@@ -0,0 +1,67 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, NamedTuple
+import pygame
+from settings import *
+
+
+class LoadJob(NamedTuple):
+    """The loading of one asset, split by the thread each step has to run on"""
+
+    # file reads and decoding, on a worker thread
+    decode: Callable[[], Any]
+    # conversion for the display and caching, on the main thread
+    finish: Callable[[Any], None]
+
+
+class AssetLoader:
+    """Decodes assets on a thread pool and finishes them on the main thread.
+
+    Nothing here blocks, so the main loop keeps pumping events and drawing while the
+    pool works: call `poll` once per frame until `done`. An error in a decode step is
+    raised again by the `poll` that finishes its job.
+    """
+
+    def __init__(self, jobs: list[LoadJob], workers: int = LOADER_WORKERS) -> None:
+        self.executor = ThreadPoolExecutor(workers)
+        self.pending: dict[Future, LoadJob] = {
+            self.executor.submit(job.decode): job for job in jobs
+        }
+        self.total = len(jobs)
+
+    @property
+    def progress(self) -> float:
+        return 1 - len(self.pending) / self.total if self.total else 1.0
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+    def poll(self) -> None:
+        for future in [future for future in self.pending if future.done()]:
+            job = self.pending.pop(future)
+            job.finish(future.result())
+        if self.done:
+            self.executor.shutdown()
+
+
+class LoadingScreen:
+    """A progress bar in the middle of the screen"""
+
+    def __init__(self) -> None:
+        self.display_surface = pygame.display.get_surface()
+        self.font = pygame.font.Font("./font/LycheeSoda.ttf", 30)
+        self.text_surf = self.font.render("Loading", False, "White")
+
+        self.bar_rect = pygame.Rect(0, 0, SCREEN_WIDTH // 3, 20)
+        self.bar_rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        self.text_rect = self.text_surf.get_rect(
+            midbottom=(self.bar_rect.centerx, self.bar_rect.top - 10)
+        )
+
+    def display(self, progress: float) -> None:
+        self.display_surface.fill("Black")
+        self.display_surface.blit(self.text_surf, self.text_rect)
+        fill_rect = self.bar_rect.copy()
+        fill_rect.width = int(self.bar_rect.width * progress)
+        pygame.draw.rect(self.display_surface, "White", fill_rect)
+        pygame.draw.rect(self.display_surface, "White", self.bar_rect, 2)
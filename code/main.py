@@ -1,26 +1,81 @@
+import logging
 import pygame, sys
 from settings import *
 from level import Level
+from loader import AssetLoader, LoadingScreen
+from profiler import ProfilerHUD, profiler
 
 
 class Game:
     def __init__(self):
         pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.screen = self.create_screen()
         pygame.display.set_caption("Sprout land")
         self.clock = pygame.time.Clock()
+        # the level is built once its assets are in, see load
+        self.loader = AssetLoader(Level.get_load_jobs())
+        self.loading_screen = LoadingScreen()
+        self.profiler_hud = ProfilerHUD(profiler, self.clock)
+
+    @staticmethod
+    def create_screen() -> pygame.Surface:
+        size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        if VSYNC:
+            # vsync needs a renderer, which pygame only sets up for scaled displays
+            try:
+                return pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+            except pygame.error as error:
+                logging.warning(f"Could not enable vsync: {error}")
+        return pygame.display.set_mode(size)
+
+    def handle_events(self) -> None:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    profiler.toggle()
+                if event.key == pygame.K_F4 and profiler.enabled:
+                    profiler.export(PROFILER_EXPORT_PATH)
+
+    def load(self) -> None:
+        """Show the loading screen while the loader works, then build the level"""
+        while not self.loader.done:
+            self.handle_events()
+            self.loader.poll()
+            self.loading_screen.display(self.loader.progress)
+            pygame.display.update()
+            self.clock.tick(FPS_CAP)
         self.level = Level()
+        # restart the frame clock, so building the level is not replayed as ticks
+        self.clock.tick()
 
     def run(self):
+        self.load()
+
+        # the simulation advances in fixed ticks, drawing happens once per frame
+        tick = 1 / TICK_RATE
+        accumulator = 0.0
         while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+            accumulator += min(self.clock.tick(FPS_CAP) / 1000, MAX_FRAME_TIME)
+            with profiler.scope("frame"):
+                with profiler.scope("events"):
+                    self.handle_events()
 
-            dt = self.clock.tick() / 1000
-            self.level.run(dt)
-            pygame.display.update()
+                with profiler.scope("update"):
+                    while accumulator >= tick:
+                        self.level.update(tick)
+                        accumulator -= tick
+
+                with profiler.scope("draw"):
+                    self.level.draw(accumulator / tick)
+                if profiler.enabled:
+                    self.profiler_hud.display()
+
+                with profiler.scope("display"):
+                    pygame.display.update()
+            profiler.end_frame()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+from array import array
+import logging
+import os
+import xml.etree.ElementTree as ElementTree
+import pygame
+from pytmx import TiledObjectGroup, TiledTileLayer
+from pytmx.util_pygame import load_pygame
+from atlas import pack_surfaces
+from cache import get_fingerprint, load_cache, write_cache
+
+# bump whenever the layout of the cache changes
+MAP_CACHE_VERSION = 1
+
+
+def get_source_files(tmx_path: str) -> list[str]:
+    """Return the map, its tileset files and every image they reference"""
+    sources = [os.path.normpath(tmx_path)]
+    pending = [os.path.normpath(tmx_path)]
+    while pending:
+        path = pending.pop()
+        directory = os.path.dirname(path)
+        for element in ElementTree.parse(path).iter():
+            if (
+                element.tag not in ("tileset", "image")
+                or "source" not in element.attrib
+            ):
+                continue
+            source = os.path.normpath(os.path.join(directory, element.attrib["source"]))
+            if source in sources:
+                continue
+            sources.append(source)
+            if source.endswith(".tsx"):
+                pending.append(source)
+    return sources
+
+
+def compile_map(tmx_path: str) -> dict:
+    """Parse a TMX map and flatten it into plain data that pickles compactly.
+
+    Tile layers become row-major arrays of tile ids, object layers become lists of
+    (name, x, y, width, height, tile id) and every tile image is packed into one atlas
+    stored as raw RGBA bytes.
+    """
+    tmx_data = load_pygame(tmx_path)
+
+    tile_layers = {}
+    object_layers = {}
+    for layer in tmx_data.layers:
+        if isinstance(layer, TiledTileLayer):
+            tile_layers[layer.name] = array(
+                "I", (gid for row in layer.data for gid in row)
+            )
+        elif isinstance(layer, TiledObjectGroup):
+            object_layers[layer.name] = [
+                (obj.name, obj.x, obj.y, obj.width, obj.height, obj.gid)
+                for obj in layer
+            ]
+
+    images = {gid: image for gid, image in enumerate(tmx_data.images) if image}
+    atlas, rects = pack_surfaces(images)
+
+    return {
+        "version": MAP_CACHE_VERSION,
+        "sources": {path: get_fingerprint(path) for path in get_source_files(tmx_path)},
+        "tile_size": (tmx_data.tilewidth, tmx_data.tileheight),
+        "size": (tmx_data.width, tmx_data.height),
+        "tile_layers": tile_layers,
+        "object_layers": object_layers,
+        "atlas": {
+            "size": atlas.get_size(),
+            "pixels": pygame.image.tobytes(atlas, "RGBA"),
+            "rects": {gid: tuple(rect) for gid, rect in rects.items()},
+        },
+    }
+
+
+def get_compiled_map(tmx_path: str, cache_path: str) -> dict:
+    """Return the compiled map from the cache, recompiling it if the sources changed"""
+    compiled_map = load_cache(cache_path, MAP_CACHE_VERSION)
+    if compiled_map is None:
+        logging.info(f"Compiling {tmx_path} into {cache_path}")
+        compiled_map = compile_map(tmx_path)
+        write_cache(compiled_map, cache_path)
+    return compiled_map
+
+
+if __name__ == "__main__":
+    # precompile the map, e.g. as a deploy step: python code/map_cache.py
+    from settings import MAP_PATH, MAP_CACHE_PATH
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    write_cache(compile_map(MAP_PATH), MAP_CACHE_PATH)
@@ -3,14 +3,22 @@ from pygame.surface import Surface
 from settings import *
 from typing import Callable
 from player import Player
-from game_timer import Timer
+from game_timer import Scheduler, Timer
+from controls import KeySource
 
 
 class Menu:
-    def __init__(self, player: Player, toggle_menu: Callable[[], None]) -> None:
+    def __init__(
+        self,
+        player: Player,
+        toggle_menu: Callable[[], None],
+        scheduler: Scheduler,
+        get_pressed: KeySource = pygame.key.get_pressed,
+    ) -> None:
         # general setup
         self.player = player
         self.toggle_menu = toggle_menu
+        self.get_pressed = get_pressed
         self.display_surface = pygame.display.get_surface()
         self.font = pygame.font.Font("./font/LycheeSoda.ttf", 30)
 
@@ -28,7 +36,7 @@ class Menu:
         
         # movement
         self.index = 0
-        self.timer = Timer(200)
+        self.timer = Timer(200, scheduler=scheduler)
         
     def display_money(self):
         text_surf = self.font.render(f"${self.player.money}", False, "Black")
@@ -58,8 +66,7 @@ class Menu:
         
 
     def input(self):
-        keys = pygame.key.get_pressed()
-        self.timer.update()
+        keys = self.get_pressed()
 
         if keys[pygame.K_ESCAPE]:
             self.toggle_menu()
@@ -116,8 +123,7 @@ class Menu:
                 pos_rect = self.buy_text.get_rect(midleft = (self.main_rect.left + 150, bg_rect.centery))
                 self.display_surface.blit(self.buy_text, pos_rect)
 
-    def update(self):
-        self.input()
+    def display(self):
         self.display_money()
         for text_index, text_surf in enumerate(self.text_surfs):
             top = self.main_rect.top + text_index * (text_surf.get_height() + (self.padding * 2) + self.space)
@@ -1,6 +1,7 @@
 import pygame
 from settings import *
 from player import Player
+from assets import assets
 
 
 class Overlay:
@@ -11,12 +12,10 @@ class Overlay:
         # imports
         overlay_path = "./graphics/overlay/"
         self.tools_surf = {
-            tool: pygame.image.load(f"{overlay_path}{tool}.png").convert_alpha()
-            for tool in player.tools
+            tool: assets.image(f"{overlay_path}{tool}.png") for tool in player.tools
         }
         self.seeds_surf = {
-            seed: pygame.image.load(f"{overlay_path}{seed}.png").convert_alpha()
-            for seed in player.seeds
+            seed: assets.image(f"{overlay_path}{seed}.png") for seed in player.seeds
         }
 
     def display(self):
@@ -1,24 +1,32 @@
 from typing import Tuple, Callable
 import pygame
 from pygame.sprite import AbstractGroup
-from game_timer import Timer
+from game_timer import Scheduler, Timer
+from collision import CollisionGroup
 from settings import *
 from support import *
 from soil import SoilLayer
 from sound import SoundManager
+from assets import assets
+from controls import KeySource
 
 
 class Player(pygame.sprite.Sprite):
+    # moves every frame, so the camera group re-indexes it every frame
+    dynamic = True
+
     def __init__(
         self,
         pos: Tuple[int, int],
-        group: AbstractGroup,
-        collision_sprites: AbstractGroup,
+        group: AbstractGroup | list[AbstractGroup],
+        collision_sprites: CollisionGroup,
         tree_sprites: AbstractGroup,
         interaction: AbstractGroup,
         soil_layer: SoilLayer,
         toggle_shop: Callable[[], None],
         sound_manager: SoundManager,
+        scheduler: Scheduler,
+        get_pressed: KeySource = pygame.key.get_pressed,
     ) -> None:
         super().__init__(group)
 
@@ -38,16 +46,19 @@ class Player(pygame.sprite.Sprite):
         self.speed = 200
         self.target_pos: Tuple[int, int]
 
+        # input
+        self.get_pressed = get_pressed
+
         # collision
         self.hitbox = self.rect.copy().inflate((-126, -70))
         self.collision_sprites = collision_sprites
 
         # timers
         self.timers = {
-            "tool use": Timer(350, self.use_tool),
-            "tool switch": Timer(200),
-            "seed use": Timer(350, self.use_seed),
-            "seed switch": Timer(200),
+            "tool use": Timer(350, self.use_tool, scheduler=scheduler),
+            "tool switch": Timer(200, scheduler=scheduler),
+            "seed use": Timer(350, self.use_seed, scheduler=scheduler),
+            "seed switch": Timer(200, scheduler=scheduler),
         }
 
         # tools
@@ -99,7 +110,7 @@ class Player(pygame.sprite.Sprite):
 
         for animation in self.animations.keys():
             full_path = "./graphics/character/" + animation
-            self.animations[animation] = import_folder(full_path)
+            self.animations[animation] = assets.folder(full_path)
 
     def animate(self, dt):
         self.frame_index += 4 * dt
@@ -108,7 +119,7 @@ class Player(pygame.sprite.Sprite):
         self.image = self.animations[self.status][int(self.frame_index)]
 
     def input(self) -> None:
-        keys = pygame.key.get_pressed()
+        keys = self.get_pressed()
 
         if not self.timers["tool use"].active and not self.sleep:
             # directions
@@ -182,24 +193,23 @@ class Player(pygame.sprite.Sprite):
             self.status = self.status.split("_")[0] + "_" + self.selected_tool
 
     def collision(self, direction):
-        for sprite in self.collision_sprites.sprites():
-            if hasattr(sprite, "hitbox"):
-                if sprite.hitbox.colliderect(self.hitbox):  # type: ignore
-                    if direction == "horizontal":
-                        if self.direction.x > 0:  # moving right
-                            self.hitbox.right = sprite.hitbox.left  # type: ignore
-                        if self.direction.x < 0:  # moving left
-                            self.hitbox.left = sprite.hitbox.right  # type: ignore
-                        self.rect.centerx = self.hitbox.centerx  # type: ignore
-                        self.pos.x = self.hitbox.centerx
-
-                    if direction == "vertical":
-                        if self.direction.y > 0:  # moving down
-                            self.hitbox.bottom = sprite.hitbox.top  # type: ignore
-                        if self.direction.y < 0:  # moving up
-                            self.hitbox.top = sprite.hitbox.bottom  # type: ignore
-                        self.rect.centery = self.hitbox.centery  # type: ignore
-                        self.pos.y = self.hitbox.centery
+        for sprite in self.collision_sprites.get_nearby(self.hitbox):
+            if sprite.hitbox.colliderect(self.hitbox):  # type: ignore
+                if direction == "horizontal":
+                    if self.direction.x > 0:  # moving right
+                        self.hitbox.right = sprite.hitbox.left  # type: ignore
+                    if self.direction.x < 0:  # moving left
+                        self.hitbox.left = sprite.hitbox.right  # type: ignore
+                    self.rect.centerx = self.hitbox.centerx  # type: ignore
+                    self.pos.x = self.hitbox.centerx
+
+                if direction == "vertical":
+                    if self.direction.y > 0:  # moving down
+                        self.hitbox.bottom = sprite.hitbox.top  # type: ignore
+                    if self.direction.y < 0:  # moving up
+                        self.hitbox.top = sprite.hitbox.bottom  # type: ignore
+                    self.rect.centery = self.hitbox.centery  # type: ignore
+                    self.pos.y = self.hitbox.centery
 
     def move(self, dt: float) -> None:
         # normalising a vector
@@ -242,14 +252,9 @@ class Player(pygame.sprite.Sprite):
             self.sound_manager.play_once("plant")
             self.seed_inventory[self.selected_seed] -= 1
 
-    def update_timers(self) -> None:
-        for timer in self.timers.values():
-            timer.update()
-
     def update(self, dt: float) -> None:
         self.input()
         self.get_status()
-        self.update_timers()
         self.get_target_pos()
         self.move(dt)
         self.animate(dt)
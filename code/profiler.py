@@ -0,0 +1,148 @@
+from collections import defaultdict, deque
+from contextlib import nullcontext
+import csv
+import json
+import logging
+import time
+from typing import Callable
+import pygame
+from settings import *
+
+# handed out while profiling is off, so a scope costs one call and an empty with block
+NULL_SCOPE = nullcontext()
+
+
+class Scope:
+    """Adds the time spent inside a with block to the frame total of a stage"""
+
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals: dict[str, float], name: str) -> None:
+        self.totals = totals
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.totals[self.name] += time.perf_counter() - self.start
+
+
+class Profiler:
+    """Times named stages of every frame and keeps the last frames in a rolling window.
+
+    Stages are timed with `with profiler.scope("name"):` and `end_frame` closes a frame.
+    Scopes of the same name in one frame add up, e.g. over several simulation ticks.
+    Counters report sizes such as sprite counts on demand.
+    """
+
+    def __init__(self, window: int = PROFILER_WINDOW) -> None:
+        self.enabled = False
+        self.window = window
+        self.totals: dict[str, float] = defaultdict(float)
+        self.scopes: dict[str, Scope] = {}
+        self.samples: dict[str, deque[float]] = {}
+        self.counters: dict[str, Callable[[], int]] = {}
+
+    def scope(self, name: str) -> Scope | nullcontext:
+        if not self.enabled:
+            return NULL_SCOPE
+        scope = self.scopes.get(name)
+        if scope is None:
+            scope = self.scopes[name] = Scope(self.totals, name)
+        return scope
+
+    def add_counter(self, name: str, counter: Callable[[], int]) -> None:
+        self.counters[name] = counter
+
+    def toggle(self) -> None:
+        self.enabled = not self.enabled
+        self.totals.clear()
+
+    def end_frame(self) -> None:
+        if not self.enabled:
+            return
+        for name in self.totals.keys() - self.samples.keys():
+            self.samples[name] = deque(maxlen=self.window)
+        # stages that did not run this frame took no time
+        for name, samples in self.samples.items():
+            samples.append(self.totals.get(name, 0.0) * 1000)
+        self.totals.clear()
+
+    def get_stats(self) -> dict[str, dict[str, float]]:
+        """Mean and max ms of every stage over the window"""
+        return {
+            name: {
+                "mean": round(sum(samples) / len(samples), 3),
+                "max": round(max(samples), 3),
+            }
+            for name, samples in self.samples.items()
+            if samples
+        }
+
+    def get_counts(self) -> dict[str, int]:
+        return {name: counter() for name, counter in self.counters.items()}
+
+    def export(self, path: str) -> None:
+        """Write the window to a CSV file with one row per frame, or a JSON file"""
+        names = sorted(self.samples)
+        if path.endswith(".json"):
+            data = {
+                "stages_ms": {name: list(self.samples[name]) for name in names},
+                "stats": self.get_stats(),
+                "counts": self.get_counts(),
+            }
+            with open(path, "w") as file:
+                json.dump(data, file, indent=2)
+        else:
+            # stages that showed up late have no samples for the earlier frames
+            frames = max((len(samples) for samples in self.samples.values()), default=0)
+            columns = [
+                [""] * (frames - len(self.samples[name])) + list(self.samples[name])
+                for name in names
+            ]
+            with open(path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(["sample"] + names)
+                for sample, row in enumerate(zip(*columns)):
+                    writer.writerow([sample, *row])
+        logging.info(f"Exported the profile to {path}")
+
+
+class ProfilerHUD:
+    """Draws the frame rate, the stage times and the counters in the top left corner"""
+
+    def __init__(self, profiler: Profiler, clock: pygame.time.Clock) -> None:
+        self.display_surface = pygame.display.get_surface()
+        self.profiler = profiler
+        self.clock = clock
+        self.font = pygame.font.Font("./font/LycheeSoda.ttf", 20)
+        self.surf: pygame.Surface | None = None
+        self.frames = 0
+
+    def render(self) -> pygame.Surface:
+        lines = [f"FPS {self.clock.get_fps():.0f}"]
+        for name, stats in sorted(self.profiler.get_stats().items()):
+            lines.append(f"{name} {stats['mean']:.2f} ms (max {stats['max']:.2f})")
+        for name, count in self.profiler.get_counts().items():
+            lines.append(f"{name} {count}")
+
+        line_surfs = [self.font.render(line, False, "White") for line in lines]
+        height = self.font.get_linesize()
+        width = max(line_surf.get_width() for line_surf in line_surfs)
+        surf = pygame.Surface((width + 10, height * len(lines) + 10))
+        for index, line_surf in enumerate(line_surfs):
+            surf.blit(line_surf, (5, 5 + index * height))
+        surf.set_alpha(200)
+        return surf
+
+    def display(self) -> None:
+        # rendering text is slow, so the numbers only refresh a few times per second
+        if self.surf is None or self.frames % PROFILER_HUD_INTERVAL == 0:
+            self.surf = self.render()
+        self.frames += 1
+        self.display_surface.blit(self.surf, (10, 10))
+
+
+profiler = Profiler()
@@ -5,6 +5,47 @@ SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 TILE_SIZE = 64
 
+# game loop, ticks and frames per second, a FPS_CAP of 0 draws as fast as possible
+TICK_RATE = 60
+FPS_CAP = 60
+VSYNC = False
+# longest frame the simulation catches up on, so a stall does not snowball
+MAX_FRAME_TIME = 0.25
+
+# profiler, F3 toggles the HUD and F4 exports the window
+PROFILER_WINDOW = 120
+PROFILER_HUD_INTERVAL = 15
+PROFILER_EXPORT_PATH = "./profile.csv"
+
+# map
+MAP_PATH = "./data/map.tmx"
+MAP_CACHE_PATH = "./data/cache/map.bin"
+
+# spatial index
+SPATIAL_CELL_SIZE = 256
+COLLISION_CELL_SIZE = 128
+
+# asset loading
+LOADER_WORKERS = 4
+
+# static layers
+STATIC_CHUNK_SIZE = 512
+# animated chunks hold a surface per frame, so they are smaller to waste less memory
+WATER_CHUNK_SIZE = 256
+
+# texture atlases
+ATLAS_WIDTH = 1024
+ATLAS_CACHE_PATH = "./data/cache/atlas.bin"
+# every image below these directories is packed into one sheet per directory
+ATLAS_FOLDERS = [
+    "./graphics/character",
+    "./graphics/water",
+    "./graphics/soil",
+    "./graphics/soil_water",
+    "./graphics/rain",
+    "./graphics/fruit",
+]
+
 # overlay positions
 OVERLAY_POSITIONS = {"tool": (40, SCREEN_HEIGHT - 15), "seed": (70, SCREEN_HEIGHT - 5)}
 
@@ -29,12 +70,27 @@ LAYERS = {
     "rain drops": 10,
 }
 
+# layers whose sprites are drawn in the order of their current centery
+Y_SORT_LAYERS = {LAYERS["main"]}
+
 APPLE_POS = {
     "Small": [(18, 17), (30, 37), (12, 50), (30, 45), (20, 30), (30, 10)],
     "Large": [(30, 24), (60, 65), (50, 50), (16, 40), (45, 50), (42, 70)],
 }
 
+# rain, spawn rates are particles per second in an area the size of the screen
+RAIN_FLOOR_RATE = 70
+RAIN_DROP_RATE = 70
+RAIN_LIFETIME = (0.4, 0.5)
+RAIN_DROP_SPEED = (200, 250)
+RAIN_DROP_DIRECTION = (-2, 4)
+RAIN_MARGIN = 64
+
+# tint the sky into the sprite images instead of multiplying the screen every frame
+TINT_BAKED = False
+
 GROW_SPEED = {"corn": 1, "tomato": 0.7}
+PLANT_TYPES = list(GROW_SPEED)
 
 SALE_PRICES = {"wood": 4, "apple": 2, "corn": 10, "tomato": 20}
 PURCHASE_PRICES = {"corn": 4, "tomato": 5}
@@ -48,3 +104,9 @@ SOUND_VOLUMES: dict[str, float] = {
     "success": 0.3,
     "water": 0.2
 }
+AUDIO_PATH = "./audio"
+# long tracks stream from disk instead of being decoded into memory
+MUSIC_TRACKS = ["music", "bg"]
+MUSIC_FADE_MS = 1000
+# short sounds are decoded once into raw PCM below this directory
+SOUND_CACHE_DIR = "./data/cache/sounds"
@@ -1,15 +1,16 @@
+import numpy as np
 import pygame
 from pygame.surface import Surface
 from settings import *
-from support import import_folder
-from sprites import Generic
-from random import randint, choice
+from assets import assets
+from game_map import GameMap
+from tint import Tint
+from random import getrandbits
 
 
 class Sky:
-    def __init__(self) -> None:
-        self.display_surface = pygame.display.get_surface()
-        self.full_surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    def __init__(self, tint: Tint) -> None:
+        self.tint = tint
         self.start_color: list[int] = [255, 255, 255]
         self.end_color: tuple[int, int, int] = (38, 101, 189)
 
@@ -17,64 +18,189 @@ class Sky:
         for index, value in enumerate(self.end_color):
             if self.start_color[index] > value:
                 self.start_color[index] -= 2 * dt  # type: ignore
-        self.full_surf.fill(self.start_color)
-        self.display_surface.blit(
-            self.full_surf, (0, 0), special_flags=pygame.BLEND_RGBA_MULT
+        self.tint.set_color("sky", self.start_color, bakeable=True)
+
+
+class ParticlePool:
+    """Fixed-size pool of particles stored in preallocated arrays.
+
+    New particles take the slots of dead or recycled ones first and only replace the
+    particles closest to the end of their life when the pool is full. All particles are
+    advanced in one vectorized step and drawn in one batched blit.
+    """
+
+    def __init__(self, frames: list[Surface], capacity: int, tint: Tint) -> None:
+        self.frames = frames
+        self.tint = tint
+        self.capacity = capacity
+        self.rng = np.random.default_rng(getrandbits(32))
+
+        # particle state, a particle is alive while its age is below its lifetime
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.age = np.zeros(capacity, dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.float32)
+        self.frame_index = np.zeros(capacity, dtype=np.int16)
+
+        # largest frame, to keep particles that poke into a rect
+        self.margin = max(frame.get_width() for frame in frames), max(
+            frame.get_height() for frame in frames
         )
 
+    def spawn(
+        self, pos: np.ndarray, velocity: np.ndarray, lifetime: np.ndarray
+    ) -> None:
+        """Spawn a batch of particles, given as arrays with one row per particle"""
+        count = min(len(pos), self.capacity)
+        if not count:
+            return
+        slots = np.argpartition(self.lifetime - self.age, count - 1)[:count]
+        self.pos[slots] = pos[:count]
+        self.velocity[slots] = velocity[:count]
+        self.age[slots] = 0
+        self.lifetime[slots] = lifetime[:count]
+        self.frame_index[slots] = self.rng.integers(len(self.frames), size=count)
 
-class Drop(Generic):
-    def __init__(self, pos, surf: Surface, moving: bool, groups, z: int) -> None:
-        # general setup
-        super().__init__(pos, surf, groups, z)
-        self.lifetime = randint(400, 500)
-        self.start_time = pygame.time.get_ticks()
+    def get_inside(self, rect: pygame.Rect) -> np.ndarray:
+        """Mask of the particles that overlap a rect"""
+        x, y = self.pos[:, 0], self.pos[:, 1]
+        return (
+            (x > rect.left - self.margin[0])
+            & (x < rect.right)
+            & (y > rect.top - self.margin[1])
+            & (y < rect.bottom)
+        )
 
-        # moving
-        self.moving = moving
-        if self.moving:
-            self.pos = pygame.math.Vector2(self.rect.topleft)  # type: ignore
-            self.direction = pygame.math.Vector2(-2, 4)
-            self.speed = randint(200, 250)
+    def recycle(self, area: pygame.Rect) -> None:
+        """Kill the particles outside an area, freeing their slots"""
+        self.age[~self.get_inside(area)] = np.inf
 
     def update(self, dt: float) -> None:
-        # movement
-        if self.moving:
-            self.pos += self.direction * self.speed * dt
-            self.rect.topleft = (round(self.pos.x), round(self.pos.y))  # type: ignore
+        self.age += dt
+        self.pos += self.velocity * dt
 
-        # timer
-        if pygame.time.get_ticks() - self.start_time >= self.lifetime:
-            self.kill()
+    def draw(
+        self, surface: Surface, offset: pygame.math.Vector2, camera_rect: pygame.Rect
+    ) -> None:
+        visible = np.flatnonzero(
+            (self.age < self.lifetime) & self.get_inside(camera_rect)
+        )
+        screen_pos = np.rint(self.pos[visible] - (offset.x, offset.y)).astype(int)
+        frames = [self.tint.get_image(frame) for frame in self.frames]
+        surface.blits(
+            [
+                (frames[frame_index], pos)
+                for frame_index, pos in zip(
+                    self.frame_index[visible].tolist(), screen_pos.tolist()
+                )
+            ],
+            doreturn=False,
+        )
 
 
 class Rain:
-    def __init__(self, all_sprites: pygame.sprite.Group) -> None:
+    """Rain around the camera.
+
+    Particles only spawn in the camera rect plus a margin, and drops also above and to
+    the right of it, where they fall into view from. The spawn rates scale with the
+    area, so the density on screen stays the same, and particles that leave the area are
+    recycled.
+    """
+
+    def __init__(self, all_sprites: pygame.sprite.Group, game_map: GameMap) -> None:
         self.all_sprites = all_sprites
-        self.rain_drops = import_folder("./graphics/rain/drops/")
-        self.rain_floor = import_folder("./graphics/rain/floor/")
-        self.floor_w, self.floor_h = pygame.image.load(
-            "./graphics/world/ground.png"
-        ).get_size()
-
-    def create_floor(self):
-        Drop(
-            surf=choice(self.rain_floor),
-            pos=(randint(0, self.floor_w), randint(0, self.floor_h)),
-            moving=False,
-            groups=self.all_sprites,
-            z=LAYERS["rain floor"],
+        self.rain_drops = assets.folder("./graphics/rain/drops/")
+        self.rain_floor = assets.folder("./graphics/rain/floor/")
+        self.map_rect = pygame.Rect(0, 0, game_map.width, game_map.height)
+        self.rng = np.random.default_rng(getrandbits(32))
+
+        # distance the fastest drop falls in its lifetime
+        max_speed = RAIN_DROP_SPEED[1] * RAIN_LIFETIME[1]
+        self.drop_travel = (
+            round(RAIN_DROP_DIRECTION[0] * max_speed),
+            round(RAIN_DROP_DIRECTION[1] * max_speed),
+        )
+
+        # particles
+        floor_area, drop_area = self.get_spawn_areas(
+            pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        )
+        self.floor_pool = ParticlePool(
+            self.rain_floor,
+            self.get_capacity(RAIN_FLOOR_RATE, floor_area),
+            all_sprites.tint,  # type: ignore
         )
+        self.drop_pool = ParticlePool(
+            self.rain_drops,
+            self.get_capacity(RAIN_DROP_RATE, drop_area),
+            all_sprites.tint,  # type: ignore
+        )
+        add_renderer = all_sprites.add_renderer  # type: ignore
+        add_renderer(LAYERS["rain floor"], self.floor_pool.draw)
+        add_renderer(LAYERS["rain drops"], self.drop_pool.draw)
+        self.floor_budget = 0.0
+        self.drop_budget = 0.0
+
+    def get_spawn_areas(
+        self, camera_rect: pygame.Rect
+    ) -> tuple[pygame.Rect, pygame.Rect]:
+        """Areas around the camera rect that floor splashes and drops spawn in"""
+        floor_area = camera_rect.inflate(RAIN_MARGIN * 2, RAIN_MARGIN * 2)
+        drop_area = floor_area.union(
+            floor_area.move(-self.drop_travel[0], -self.drop_travel[1])
+        )
+        return floor_area, drop_area
+
+    @staticmethod
+    def get_rate(rate: float, area: pygame.Rect) -> float:
+        """Spawn rate in an area, given the rate for an area the size of the screen"""
+        return rate * area.width * area.height / (SCREEN_WIDTH * SCREEN_HEIGHT)
+
+    def get_capacity(self, rate: float, area: pygame.Rect) -> int:
+        # enough slots for every particle alive at once, with a little headroom
+        return int(self.get_rate(rate, area) * RAIN_LIFETIME[1] * 1.25) + 1
 
-    def create_drops(self):
-        Drop(
-            surf=choice(self.rain_drops),
-            pos=(randint(0, self.floor_w), randint(0, self.floor_h)),
-            moving=True,
-            groups=self.all_sprites,
-            z=LAYERS["rain drops"],
+    def get_positions(self, area: pygame.Rect, count: int) -> np.ndarray:
+        return np.column_stack(
+            (
+                self.rng.uniform(area.left, area.right, count),
+                self.rng.uniform(area.top, area.bottom, count),
+            )
         )
 
-    def update(self):
-        self.create_floor()
-        self.create_drops()
+    def create_floor(self, area: pygame.Rect, count: int) -> None:
+        self.floor_pool.spawn(
+            pos=self.get_positions(area, count),
+            velocity=np.zeros((count, 2)),
+            lifetime=self.rng.uniform(*RAIN_LIFETIME, count),
+        )
+
+    def create_drops(self, area: pygame.Rect, count: int) -> None:
+        speed = self.rng.uniform(*RAIN_DROP_SPEED, (count, 1))
+        self.drop_pool.spawn(
+            pos=self.get_positions(area, count),
+            velocity=speed * RAIN_DROP_DIRECTION,
+            lifetime=self.rng.uniform(*RAIN_LIFETIME, count),
+        )
+
+    def update(self, dt: float, spawn: bool = True) -> None:
+        # rain only falls on the map
+        camera_rect = self.all_sprites.get_camera_rect()  # type: ignore
+        floor_area, drop_area = self.get_spawn_areas(camera_rect)
+        floor_area = floor_area.clip(self.map_rect)
+        drop_area = drop_area.clip(self.map_rect)
+
+        self.floor_pool.update(dt)
+        self.drop_pool.update(dt)
+        self.floor_pool.recycle(floor_area)
+        self.drop_pool.recycle(drop_area)
+        if not spawn:
+            return
+
+        # spawn rates are per second, carry the fractions over to the next frame
+        self.floor_budget += self.get_rate(RAIN_FLOOR_RATE, floor_area) * dt
+        self.drop_budget += self.get_rate(RAIN_DROP_RATE, drop_area) * dt
+        self.create_floor(floor_area, int(self.floor_budget))
+        self.create_drops(drop_area, int(self.drop_budget))
+        self.floor_budget %= 1
+        self.drop_budget %= 1
@@ -1,10 +1,92 @@
 from random import choice
+import numpy as np
 import pygame
 from pygame.sprite import Sprite, Group
-from typing import Callable
 from settings import *
-from pytmx.util_pygame import load_pygame
-from support import import_folder_dict, import_folder
+from game_map import GameMap
+from assets import assets
+from spatial import refresh_groups
+
+
+# soil grid flags
+FARMABLE = 1
+TILLED = 2
+WATERED = 4
+PLANTED = 8
+
+# neighbour code bits, set for every tilled neighbour of a cell
+NEIGHBOUR_TOP = 1
+NEIGHBOUR_BOTTOM = 2
+NEIGHBOUR_LEFT = 4
+NEIGHBOUR_RIGHT = 8
+
+# soil graphic for each neighbour code
+SOIL_TILE_TYPES = (
+    "o", "b", "t", "tb",
+    "r", "br", "tr", "tbl",
+    "l", "bl", "tl", "tbr",
+    "lr", "lrb", "lrt", "x",
+)  # fmt: skip
+NO_SOIL_TILE = 255
+
+
+class SoilGrid:
+    """Soil state of every tile, stored as a bitfield of the flags above.
+
+    Cells are addressed as (x, y) in tile coordinates. `cells` is a (v_tiles, h_tiles)
+    uint8 array, so whole-field updates are vectorized mask operations.
+    """
+
+    def __init__(self, h_tiles: int, v_tiles: int) -> None:
+        self.cells = np.zeros((v_tiles, h_tiles), dtype=np.uint8)
+
+    def has(self, x: int, y: int, flag: int) -> bool:
+        return bool(self.cells[y, x] & flag)
+
+    def add(self, x: int, y: int, flag: int) -> None:
+        self.cells[y, x] |= flag
+
+    def remove(self, x: int, y: int, flag: int) -> None:
+        self.cells[y, x] &= ~np.uint8(flag)
+
+    def get_mask(self, flag: int) -> np.ndarray:
+        """Boolean array of the cells that have the flag"""
+        return (self.cells & flag).astype(bool)
+
+    def add_all(self, mask: np.ndarray, flag: int) -> None:
+        self.cells[mask] |= flag
+
+    def remove_all(self, flag: int) -> None:
+        self.cells &= ~np.uint8(flag)
+
+    def get_neighbour_code(self, x: int, y: int, flag: int) -> int:
+        """Neighbour code of one cell, cells off the map count as unset"""
+        v_tiles, h_tiles = self.cells.shape
+        code = 0
+        if y > 0 and self.cells[y - 1, x] & flag:
+            code |= NEIGHBOUR_TOP
+        if y < v_tiles - 1 and self.cells[y + 1, x] & flag:
+            code |= NEIGHBOUR_BOTTOM
+        if x > 0 and self.cells[y, x - 1] & flag:
+            code |= NEIGHBOUR_LEFT
+        if x < h_tiles - 1 and self.cells[y, x + 1] & flag:
+            code |= NEIGHBOUR_RIGHT
+        return code
+
+    def get_neighbour_codes(self, flag: int) -> np.ndarray:
+        """Neighbour code of every cell, computed by shifting the flag mask"""
+        mask = self.get_mask(flag).astype(np.uint8)
+        codes = np.zeros(self.cells.shape, dtype=np.uint8)
+        codes[1:, :] |= mask[:-1, :] * NEIGHBOUR_TOP
+        codes[:-1, :] |= mask[1:, :] * NEIGHBOUR_BOTTOM
+        codes[:, 1:] |= mask[:, :-1] * NEIGHBOUR_LEFT
+        codes[:, :-1] |= mask[:, 1:] * NEIGHBOUR_RIGHT
+        return codes
+
+    @staticmethod
+    def get_coords(mask: np.ndarray) -> list[tuple[int, int]]:
+        """(x, y) of every cell set in a mask, row by row"""
+        return [(int(x), int(y)) for y, x in np.argwhere(mask)]
 
 
 class SoilTile(Sprite):
@@ -33,59 +115,145 @@ class WaterTile(Sprite):
         self.z = LAYERS["soil water"]
 
 
+class PlantStore:
+    """Growth state of every plant, stored column by column.
+
+    Each plant owns a slot in the columns; slots of harvested plants are reused. The
+    daily growth step is one vectorized pass over all slots against the watered cells.
+    """
+
+    COLUMNS = (
+        "x",
+        "y",
+        "plant_type",
+        "age",
+        "max_age",
+        "grow_speed",
+        "harvestable",
+        "alive",
+    )
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.capacity = 0
+        self.count = 0
+        self.free_slots: list[int] = []
+
+        # columns
+        self.x = np.zeros(0, dtype=np.int32)
+        self.y = np.zeros(0, dtype=np.int32)
+        self.plant_type = np.zeros(0, dtype=np.uint8)
+        self.age = np.zeros(0, dtype=np.float64)
+        self.max_age = np.zeros(0, dtype=np.float64)
+        self.grow_speed = np.zeros(0, dtype=np.float64)
+        self.harvestable = np.zeros(0, dtype=bool)
+        self.alive = np.zeros(0, dtype=bool)
+        self.grow_columns(capacity)
+
+    def grow_columns(self, capacity: int) -> None:
+        extra = capacity - self.capacity
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate((column, np.zeros(extra, column.dtype))))
+        self.capacity = capacity
+
+    def add(self, x: int, y: int, plant_type: str, max_age: int) -> int:
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            if self.count == self.capacity:
+                self.grow_columns(self.capacity * 2)
+            slot = self.count
+            self.count += 1
+
+        self.x[slot] = x
+        self.y[slot] = y
+        self.plant_type[slot] = PLANT_TYPES.index(plant_type)
+        self.age[slot] = 0
+        self.max_age[slot] = max_age
+        self.grow_speed[slot] = GROW_SPEED[plant_type]
+        self.harvestable[slot] = False
+        self.alive[slot] = True
+        return slot
+
+    def remove(self, slot: int) -> None:
+        self.alive[slot] = False
+        self.free_slots.append(slot)
+
+    def grow(self, watered: np.ndarray) -> np.ndarray:
+        """Age every plant on a watered cell, returns the slots whose frame changed"""
+        count = self.count
+        age, max_age = self.age[:count], self.max_age[:count]
+        growing = np.flatnonzero(
+            self.alive[:count]
+            & (age < max_age)
+            & watered[self.y[:count], self.x[:count]]
+        )
+
+        old_age = age[growing]
+        new_age = old_age + self.grow_speed[growing]
+        changed = growing[new_age.astype(int) != old_age.astype(int)]
+        ripe = new_age >= max_age[growing]
+        age[growing] = np.where(ripe, max_age[growing], new_age)
+        self.harvestable[growing[ripe]] = True
+        return changed
+
+
 class Plant(Sprite):
+    """Sprite of a plant, its growth state lives in a PlantStore slot"""
+
     def __init__(
         self,
         plant_type: str,
         soil: Sprite,
-        check_watered: Callable[[tuple[float, float]], bool],
+        store: PlantStore,
+        cell: tuple[int, int],
         groups: list[Group],
     ) -> None:
         super().__init__(*groups)
 
         # setup
         self.plant_type = plant_type
-        self.frames = import_folder(f"./graphics/fruit/{plant_type}")
+        self.frames = assets.folder(f"./graphics/fruit/{plant_type}")
         self.soil = soil
-        self.check_watered = check_watered
 
         # plant growing
-        self.age = 0
-        self.max_age = len(self.frames) - 1
-        self.grow_speed = GROW_SPEED[plant_type]
-        self.harvestable = False
+        self.store = store
+        self.slot = store.add(*cell, plant_type, len(self.frames) - 1)
 
         # sprite setup
-        self.image = self.frames[self.age]
+        self.image = self.frames[0]
         self.y_offset = -16 if plant_type == "corn" else -8
         self.rect = self.image.get_rect(midbottom=soil.rect.midbottom + pygame.math.Vector2(0, self.y_offset))  # type: ignore
         self.z = LAYERS["ground plant"]
 
-    def grow(self) -> None:
-        if self.age >= self.max_age:
-            return
+    @property
+    def age(self) -> float:
+        return float(self.store.age[self.slot])
 
-        if not self.rect:
-            raise ValueError("Plant {self} does not have a rect")
-        if self.check_watered(self.rect.center):
-            self.age += self.grow_speed
-            self.image = self.frames[int(self.age)]
+    @property
+    def harvestable(self) -> bool:
+        return bool(self.store.harvestable[self.slot])
 
-            # Update rect to fit new image
-            self.rect = self.image.get_rect(midbottom=self.soil.rect.midbottom + pygame.math.Vector2(0, self.y_offset))  # type: ignore
+    def update_frame(self, age: float) -> None:
+        """Show the frame of an age, after the plant grew"""
+        self.image = self.frames[int(age)]
 
-            # Move plant to the main layer so it collides with the character
-            if self.age >= 1:
-                self.z = LAYERS["main"]
-                self.hitbox = self.rect.copy().inflate(-26, -self.rect.height * 0.4)
+        # Update rect to fit new image
+        midbottom = self.soil.rect.midbottom + pygame.math.Vector2(0, self.y_offset)
+        self.rect = self.image.get_rect(midbottom=midbottom)  # type: ignore
 
-            if self.age >= self.max_age:
-                self.age = self.max_age
-                self.harvestable = True
+        # Move plant to the main layer so it collides with the character
+        if age >= 1:
+            self.z = LAYERS["main"]
+            self.hitbox = self.rect.copy().inflate(-26, -self.rect.height * 0.4)
 
 
 class SoilLayer:
-    def __init__(self, all_sprites: Group, collision_sprites: Group) -> None:
+    def __init__(
+        self, all_sprites: Group, collision_sprites: Group, game_map: GameMap
+    ) -> None:
+        self.game_map = game_map
+
         # sprite groups
         self.all_sprites = all_sprites
         self.collision_sprites = collision_sprites
@@ -93,54 +261,42 @@ class SoilLayer:
         self.water_sprites = Group()
         self.plant_sprites = Group()
 
+        # sprites by cell, so tools resolve their target with a single lookup
+        self.soil_tiles: dict[tuple[int, int], SoilTile] = {}
+        self.water_tiles: dict[tuple[int, int], WaterTile] = {}
+        self.plants: dict[tuple[int, int], Plant] = {}
+        self.plant_store = PlantStore()
+
         # graphics
-        self.soil_surfs = import_folder_dict("./graphics/soil/")
-        self.water_surfs = import_folder("./graphics/soil_water/")
+        self.soil_surfs = assets.folder_dict("./graphics/soil/")
+        self.water_surfs = assets.folder("./graphics/soil_water/")
 
         self.create_soil_grid()
-        self.create_hit_rects()
+        # neighbour code of the soil sprite on every cell
+        self.tile_codes = np.full(self.grid.cells.shape, NO_SOIL_TILE, dtype=np.uint8)
         self.raining = False
 
-        # sounds
-        self.hoe_sound = pygame.mixer.Sound("./audio/hoe.wav")
-        self.hoe_sound.set_volume(0.1)
-        self.plant_sound = pygame.mixer.Sound("./audio/plant.wav")
-        self.plant_sound.set_volume(0.2)
-
     def create_soil_grid(self) -> None:
-        ground = pygame.image.load("./graphics/world/ground.png")
-        h_tiles, v_tiles = (
-            ground.get_width() // TILE_SIZE,
-            ground.get_height() // TILE_SIZE,
-        )
+        h_tiles, v_tiles = self.game_map.h_tiles, self.game_map.v_tiles
+
+        self.grid = SoilGrid(h_tiles, v_tiles)
+        for x, y, _ in self.game_map.get_tiles("Farmable"):
+            self.grid.add(x, y, FARMABLE)
 
-        self.grid = [[[] for col in range(h_tiles)] for row in range(v_tiles)]
-        for x, y, _ in (
-            load_pygame("./data/map.tmx").get_layer_by_name("Farmable").tiles()
-        ):
-            self.grid[y][x].append("F")
-
-    def create_hit_rects(self) -> None:
-        self.hit_rects: list[pygame.Rect] = []
-        for index_row, row in enumerate(self.grid):
-            for index_col, cell in enumerate(row):
-                if "F" in cell:
-                    x = index_col * TILE_SIZE
-                    y = index_row * TILE_SIZE
-                    rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
-                    self.hit_rects.append(rect)
+    def in_bounds(self, x: int, y: int) -> bool:
+        v_tiles, h_tiles = self.grid.cells.shape
+        return 0 <= x < h_tiles and 0 <= y < v_tiles
 
     def get_hit(self, point) -> None:
-        for rect in self.hit_rects:
-            if rect.collidepoint(point):
-                x = rect.x // TILE_SIZE
-                y = rect.y // TILE_SIZE
+        x, y = self.get_pos_grid_coord(point)
+        if not self.in_bounds(x, y):
+            return
 
-                if "F" in self.grid[y][x]:
-                    self.grid[y][x].append("X")
-                    self.create_soil_tiles()
-                    if self.raining:
-                        self.water_all()
+        if self.grid.has(x, y, FARMABLE) and not self.grid.has(x, y, TILLED):
+            self.grid.add(x, y, TILLED)
+            self.update_soil_tiles(x, y)
+            if self.raining:
+                self.water_all()
 
     @staticmethod
     def get_sprite_grid_coord(sprite: Sprite) -> tuple[int, int]:
@@ -162,121 +318,112 @@ class SoilLayer:
         y = int(pos[1] // TILE_SIZE)
         return (x, y)
 
+    def create_water_tile(self, index_col: int, index_row: int) -> None:
+        self.grid.add(index_col, index_row, WATERED)
+        self.water_tiles[(index_col, index_row)] = WaterTile(
+            (index_col * TILE_SIZE, index_row * TILE_SIZE),
+            choice(self.water_surfs),
+            [self.all_sprites, self.water_sprites],
+        )
+
     def water(self, target_pos: tuple[int, int]) -> None:
-        for soil_sprite in self.soil_sprites.sprites():
-            if soil_sprite.rect.collidepoint(target_pos):  # type: ignore
-                # 1. add an entry to the soil grid -> 'W'
-                x, y = self.get_sprite_grid_coord(soil_sprite)
-                self.grid[y][x].append("W")
-                # 2. create a water sprite
-                pos = soil_sprite.rect.topleft  # type: ignore
-                surf = choice(self.water_surfs)
-                WaterTile(pos, surf, [self.all_sprites, self.water_sprites])
+        cell = self.get_pos_grid_coord(target_pos)
+        if cell in self.soil_tiles and cell not in self.water_tiles:
+            self.create_water_tile(*cell)
 
     def water_all(self) -> None:
-        for index_row, row in enumerate(self.grid):
-            for index_col, cell in enumerate(row):
-                if "X" in cell and "W" not in cell:
-                    cell.append("W")
-                    x = index_col * TILE_SIZE
-                    y = index_row * TILE_SIZE
-                    WaterTile(
-                        (x, y),
-                        choice(self.water_surfs),
-                        [self.all_sprites, self.water_sprites],
-                    )
+        dry = self.grid.get_mask(TILLED) & ~self.grid.get_mask(WATERED)
+        for index_col, index_row in self.grid.get_coords(dry):
+            self.create_water_tile(index_col, index_row)
 
     def remove_water(self):
         # destroy all water sprites
         for sprite in self.water_sprites.sprites():
             sprite.kill()
+        self.water_tiles.clear()
         # clean up the grid
-        for row in self.grid:
-            for cell in row:
-                if "W" in cell:
-                    cell.remove("W")
-
-    def check_watered(self, pos: tuple[float, float]) -> bool:
-        x, y = self.get_pos_grid_coord(pos)
-        return "W" in self.grid[y][x]
+        self.grid.remove_all(WATERED)
 
     def plant_seed(self, target_pos: tuple[float, float], seed: str) -> None:
-        for soil_sprite in self.soil_sprites.sprites():
-            if soil_sprite.rect.collidepoint(target_pos):  # type: ignore
-                x, y = self.get_sprite_grid_coord(soil_sprite)
-
-                if "P" not in self.grid[y][x]:
-                    self.grid[y][x].append("P")
-                    Plant(
-                        plant_type=seed,
-                        soil=soil_sprite,
-                        check_watered=self.check_watered,
-                        groups=[
-                            self.all_sprites,
-                            self.plant_sprites,
-                            self.collision_sprites,
-                        ],
-                    )
+        cell = self.get_pos_grid_coord(target_pos)
+        soil_sprite = self.soil_tiles.get(cell)
+        if soil_sprite and cell not in self.plants:
+            self.grid.add(*cell, PLANTED)
+            self.plants[cell] = Plant(
+                plant_type=seed,
+                soil=soil_sprite,
+                store=self.plant_store,
+                cell=cell,
+                groups=[
+                    self.all_sprites,
+                    self.plant_sprites,
+                    self.collision_sprites,
+                ],
+            )
+
+    def remove_plant(self, plant: Plant) -> None:
+        cell = self.get_sprite_grid_coord(plant)
+        plant.kill()
+        self.plant_store.remove(plant.slot)
+        del self.plants[cell]
+        self.grid.remove(*cell, PLANTED)
+
+    def get_plants(self, rect: pygame.Rect) -> list[Plant]:
+        """Plants rooted in the cells a rect overlaps or borders"""
+        left, top = self.get_pos_grid_coord(rect.topleft)
+        right, bottom = self.get_pos_grid_coord(rect.bottomright)
+        return [
+            self.plants[(x, y)]
+            for y in range(top - 1, bottom + 2)
+            for x in range(left - 1, right + 2)
+            if (x, y) in self.plants
+        ]
 
     def update_plants(self) -> None:
-        for plant in self.plant_sprites.sprites():
-            plant.grow()  # type: ignore
+        """Grow every watered plant, only plants with a new frame touch their sprite"""
+        store = self.plant_store
+        changed = store.grow(self.grid.get_mask(WATERED))
+        x, y, age = store.x[changed], store.y[changed], store.age[changed]
+        for x, y, age in zip(x.tolist(), y.tolist(), age.tolist()):
+            plant = self.plants[(x, y)]
+            plant.update_frame(age)
+            refresh_groups(plant)
+
+    def set_soil_tile(self, index_col: int, index_row: int, code: int) -> None:
+        """Replace the soil sprite of a cell with the graphic of a neighbour code"""
+        old_tile = self.soil_tiles.pop((index_col, index_row), None)
+        if old_tile:
+            old_tile.kill()
+
+        self.tile_codes[index_row, index_col] = code
+        if code != NO_SOIL_TILE:
+            self.soil_tiles[(index_col, index_row)] = SoilTile(
+                pos=(index_col * TILE_SIZE, index_row * TILE_SIZE),
+                surf=self.soil_surfs[SOIL_TILE_TYPES[code]],
+                groups=[self.all_sprites, self.soil_sprites],
+            )
+
+    def update_soil_tiles(self, index_col: int, index_row: int) -> None:
+        """Re-tile the 3x3 neighbourhood of a cell after it changed"""
+        v_tiles, h_tiles = self.grid.cells.shape
+        for row in range(max(index_row - 1, 0), min(index_row + 2, v_tiles)):
+            for col in range(max(index_col - 1, 0), min(index_col + 2, h_tiles)):
+                code = NO_SOIL_TILE
+                if self.grid.has(col, row, TILLED):
+                    code = self.grid.get_neighbour_code(col, row, TILLED)
+                if code != self.tile_codes[row, col]:
+                    self.set_soil_tile(col, row, code)
 
     def create_soil_tiles(self) -> None:
-        self.soil_sprites.empty()
-        for index_row, row in enumerate(self.grid):
-            for index_col, cell in enumerate(row):
-                if "X" in cell:
-                    # tile options
-                    t = "X" in self.grid[index_row - 1][index_col]
-                    b = "X" in self.grid[index_row + 1][index_col]
-                    r = "X" in row[index_col + 1]
-                    l = "X" in row[index_col - 1]
-
-                    tile_type = "o"
-
-                    # all sides
-                    if all((t, b, l, r)):
-                        tile_type = "x"
-
-                    # horizontal tiles only
-                    if l and not any((t, b, r)):
-                        tile_type = "r"
-                    if r and not any((t, b, l)):
-                        tile_type = "l"
-                    if r and l and not any((t, b)):
-                        tile_type = "lr"
-
-                    # vertical tiles only
-                    if t and not any((b, l, r)):
-                        tile_type = "b"
-                    if b and not any((t, l, r)):
-                        tile_type = "t"
-                    if t and b and not any((l, r)):
-                        tile_type = "tb"
-
-                    # corners
-                    if l and b and not any((t, r)):
-                        tile_type = "tr"
-                    if r and b and not any((t, l)):
-                        tile_type = "tl"
-                    if l and t and not any((b, r)):
-                        tile_type = "br"
-                    if r and t and not any((b, l)):
-                        tile_type = "bl"
-
-                    # t-shapes
-                    if all((t, b, l)) and not r:
-                        tile_type = "tbl"
-                    if all((t, b, r)) and not l:
-                        tile_type = "tbr"
-                    if all((b, l, r)) and not t:
-                        tile_type = "lrt"
-                    if all((t, l, r)) and not b:
-                        tile_type = "lrb"
-
-                    SoilTile(
-                        pos=(index_col * TILE_SIZE, index_row * TILE_SIZE),
-                        surf=self.soil_surfs[tile_type],
-                        groups=[self.all_sprites, self.soil_sprites],
-                    )
+        """Re-tile the whole field in one pass, e.g. after many cells changed at once.
+
+        Neighbour codes are computed for the entire grid at once and only the cells
+        whose code differs from their current sprite are replaced.
+        """
+        codes = np.where(
+            self.grid.get_mask(TILLED),
+            self.grid.get_neighbour_codes(TILLED),
+            NO_SOIL_TILE,
+        ).astype(np.uint8)
+        for index_col, index_row in self.grid.get_coords(codes != self.tile_codes):
+            self.set_soil_tile(index_col, index_row, int(codes[index_row, index_col]))
@@ -1,51 +1,116 @@
+import pygame
 from pygame.mixer import Sound
 from pathlib import Path
 from settings import *
 import logging
+from assets import assets
+from game_timer import ScheduledEvent, Scheduler
+
+
+class MusicPlayer:
+    """Streams one long track at a time from disk through pygame.mixer.music.
+
+    pygame has a single music stream, so changing tracks fades the playing one out and
+    only then fades the next one in. The switch is scheduled on the scheduler it gets,
+    the interface scheduler of the level, which keeps running while the world is paused.
+    """
+
+    def __init__(self, tracks: dict[str, Path], scheduler: Scheduler) -> None:
+        self.tracks = tracks
+        self.scheduler = scheduler
+        self.current: str | None = None
+        self.pending: ScheduledEvent | None = None
+
+    def play(self, track_name: str, fade_ms: int = MUSIC_FADE_MS) -> None:
+        if track_name == self.current:
+            return
+        if self.pending:
+            self.pending.cancel()
+            self.pending = None
+
+        if self.current and pygame.mixer.music.get_busy():
+            pygame.mixer.music.fadeout(fade_ms)
+            self.pending = self.scheduler.schedule(
+                fade_ms, lambda: self.start(track_name, fade_ms)
+            )
+        else:
+            self.start(track_name, fade_ms)
+        self.current = track_name
+
+    def start(self, track_name: str, fade_ms: int) -> None:
+        self.pending = None
+        pygame.mixer.music.load(str(self.tracks[track_name]))
+        pygame.mixer.music.set_volume(SOUND_VOLUMES.get(track_name, 1.0))
+        pygame.mixer.music.play(loops=-1, fade_ms=fade_ms)
+        logging.info(f"Streaming {self.tracks[track_name]}")
+
+    def stop(self, fade_ms: int = MUSIC_FADE_MS) -> None:
+        if self.pending:
+            self.pending.cancel()
+            self.pending = None
+        pygame.mixer.music.fadeout(fade_ms)
+        self.current = None
 
 
 class SoundManager:
-    """Manages importing , configuring and playing of all game sounds."""
+    """Manages importing , configuring and playing of all game sounds.
 
-    def __init__(self, audio_dir: Path) -> None:
-        self.audio_dir = audio_dir
-        self.sounds: dict[str, Sound] = self.import_sounds()
-        self.set_volume()
-        self.play_indefinite("music")
+    Tracks named in MUSIC_TRACKS are streamed by a MusicPlayer, every other sound is
+    loaded from the decoded sound cache the first time it plays.
+    """
 
-    def import_sounds(self) -> dict[str, Sound]:
-        sounds: dict[str, Sound] = {}
+    def __init__(self, audio_dir: Path, scheduler: Scheduler) -> None:
+        self.audio_dir = audio_dir
+        self.sounds: dict[str, Sound] = {}
+        self.volumes: dict[str, float] = {}
+        audio_files = self.find_audio_files(audio_dir)
+        self.sound_files = {
+            name: path for name, path in audio_files.items() if name not in MUSIC_TRACKS
+        }
+        self.music = MusicPlayer(
+            {name: path for name, path in audio_files.items() if name in MUSIC_TRACKS},
+            scheduler,
+        )
 
+    @staticmethod
+    def find_audio_files(audio_dir: Path) -> dict[str, Path]:
         # search for audio files
         supported_formats = ("mp3", "wav")
         audio_files: list[Path] = []
         glob_patterns = [f"*.{extension}" for extension in supported_formats]
         for glob_pattern in glob_patterns:
-            audio_files += self.audio_dir.glob(glob_pattern)
-        logging.info(f"Found {len(audio_files)} audio files in {self.audio_dir}")
-
-        # load audio files as pygame Sounds
-        for audio_file in audio_files:
-            sounds[audio_file.stem] = Sound(audio_file)
-            logging.info(f"Loaded {audio_file}into audio manager")
-
-        return sounds
-
-    def set_volume(self) -> None:
-        for sound_key, sound in self.sounds.items():
-            if sound_key in SOUND_VOLUMES.keys():
-                logging.info(
-                    f"Setting volume of {sound_key} to {SOUND_VOLUMES[sound_key]}"
-                )
-                sound.set_volume(SOUND_VOLUMES[sound_key])
-            else:
-                logging.warning(
-                    f"The volume of {sound_key} is not set. Using default value 1.0"
-                )
-                sound.set_volume(1.0)
+            audio_files += audio_dir.glob(glob_pattern)
+        logging.info(f"Found {len(audio_files)} audio files in {audio_dir}")
+        return {audio_file.stem: audio_file for audio_file in audio_files}
+
+    def get_sound(self, sound_name: str) -> Sound:
+        if sound_name not in self.sounds:
+            self.sounds[sound_name] = assets.sound(self.sound_files[sound_name])
+            self.volumes[sound_name] = self.get_volume(sound_name)
+            logging.info(f"Loaded {self.sound_files[sound_name]} into audio manager")
+        return self.sounds[sound_name]
+
+    @staticmethod
+    def get_volume(sound_key: str) -> float:
+        if sound_key in SOUND_VOLUMES.keys():
+            logging.info(f"Setting volume of {sound_key} to {SOUND_VOLUMES[sound_key]}")
+            return SOUND_VOLUMES[sound_key]
+        logging.warning(
+            f"The volume of {sound_key} is not set. Using default value 1.0"
+        )
+        return 1.0
+
+    def play(self, sound_name: str, loops: int = 0) -> None:
+        # the Sound is shared by the asset registry, so the volume is set on the channel
+        channel = self.get_sound(sound_name).play(loops=loops)
+        if channel:
+            channel.set_volume(self.volumes[sound_name])
 
     def play_once(self, sound_name: str) -> None:
-        self.sounds[sound_name].play()
+        self.play(sound_name)
 
     def play_indefinite(self, sound_name: str) -> None:
-        self.sounds[sound_name].play(loops=-1)
+        if sound_name in self.music.tracks:
+            self.music.play(sound_name)
+        else:
+            self.play(sound_name, loops=-1)
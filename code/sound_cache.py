@@ -0,0 +1,36 @@
+import logging
+import pygame
+from cache import get_fingerprint, load_cache, write_cache
+
+# bump whenever the layout of the cache changes
+SOUND_CACHE_VERSION = 1
+
+
+def get_cache_path(path: str, cache_dir: str) -> str:
+    return f"{cache_dir}/{path.replace('/', '_').replace('.', '_')}.bin"
+
+
+def compile_sound(path: str) -> dict:
+    """Decode a sound file into raw PCM in the format of the running mixer"""
+    return {
+        "version": SOUND_CACHE_VERSION,
+        "sources": {path: get_fingerprint(path)},
+        "mixer": pygame.mixer.get_init(),
+        "pcm": pygame.mixer.Sound(path).get_raw(),
+    }
+
+
+def get_compiled_sound(path: str, cache_dir: str) -> dict:
+    """Return the decoded sound from the cache, decoding it again if the file changed.
+
+    PCM only plays back right in the mixer format it was decoded for, so a cache written
+    by a mixer with another frequency, sample size or channel count is decoded again
+    too.
+    """
+    cache_path = get_cache_path(path, cache_dir)
+    compiled_sound = load_cache(cache_path, SOUND_CACHE_VERSION)
+    if compiled_sound is None or compiled_sound["mixer"] != pygame.mixer.get_init():
+        logging.info(f"Decoding {path} into {cache_path}")
+        compiled_sound = compile_sound(path)
+        write_cache(compiled_sound, cache_path)
+    return compiled_sound
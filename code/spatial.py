@@ -0,0 +1,90 @@
+from collections import defaultdict
+from typing import Hashable
+import pygame
+from pygame.sprite import Sprite
+
+
+class SpatialGrid:
+    """Uniform grid that buckets items by the cells their rect overlaps.
+
+    Items are only ever looked up through the cells a query rect touches, so the cost
+    of a query depends on the size of the queried area and not on the number of items.
+    """
+
+    def __init__(self, cell_size: int) -> None:
+        self.cell_size = cell_size
+        self.cells: defaultdict[tuple[int, int], set] = defaultdict(set)
+        self.item_cells: dict[Hashable, tuple[int, int, int, int]] = {}
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.item_cells
+
+    def __len__(self) -> int:
+        return len(self.item_cells)
+
+    def get_cell_range(self, rect: pygame.Rect) -> tuple[int, int, int, int]:
+        """Return the (left, top, right, bottom) cells covered by a rect, inclusive"""
+        left = int(rect.left // self.cell_size)
+        top = int(rect.top // self.cell_size)
+        right = int(max(rect.left, rect.right - 1) // self.cell_size)
+        bottom = int(max(rect.top, rect.bottom - 1) // self.cell_size)
+        return (left, top, right, bottom)
+
+    def insert(self, item: Hashable, rect: pygame.Rect) -> None:
+        cell_range = self.get_cell_range(rect)
+        self.item_cells[item] = cell_range
+        for cell in self.iter_cells(cell_range):
+            self.cells[cell].add(item)
+
+    def remove(self, item: Hashable) -> None:
+        cell_range = self.item_cells.pop(item, None)
+        if cell_range is None:
+            return
+        for cell in self.iter_cells(cell_range):
+            bucket = self.cells[cell]
+            bucket.discard(item)
+            if not bucket:
+                del self.cells[cell]
+
+    def update(self, item: Hashable, rect: pygame.Rect) -> bool:
+        """Move an item to the cells of its new rect.
+
+        Returns:
+            bool: True if the item changed cells
+        """
+        if self.item_cells.get(item) == self.get_cell_range(rect):
+            return False
+        self.remove(item)
+        self.insert(item, rect)
+        return True
+
+    def query(self, rect: pygame.Rect) -> set:
+        """Return every item stored in a cell the rect overlaps.
+
+        This is a broadphase: items near the edge of the rect may not overlap it
+        themselves.
+        """
+        found = set()
+        cells = self.cells
+        for cell in self.iter_cells(self.get_cell_range(rect)):
+            if cell in cells:
+                found.update(cells[cell])
+        return found
+
+    @staticmethod
+    def iter_cells(cell_range: tuple[int, int, int, int]):
+        left, top, right, bottom = cell_range
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                yield (cell_x, cell_y)
+
+
+def refresh_groups(sprite: Sprite) -> None:
+    """Re-index a sprite in every spatially indexed group it belongs to.
+
+    Call this whenever a sprite outside of its group's per-frame bookkeeping changes its
+    rect, hitbox or z.
+    """
+    for group in sprite.groups():
+        if hasattr(group, "refresh"):
+            group.refresh(sprite)  # type: ignore
@@ -3,6 +3,10 @@ from random import randint, choice
 import pygame
 from settings import *
 from pygame.surface import Surface
+from spatial import refresh_groups
+from assets import assets
+from game_timer import Scheduler
+from animation import Animation
 
 
 class Generic(pygame.sprite.Sprite):
@@ -23,27 +27,21 @@ class Interaction(Generic):
         self.name = name
 
 
-class Water(Generic):
-    def __init__(self, pos, frames, groups) -> None:
-        # animation setup
-        self.frames = frames
-        self.frame_index = 0
-
-        super().__init__(
-            pos=pos,
-            surf=self.frames[self.frame_index],
-            groups=groups,
-            z=LAYERS["water"],
-        )
+class AnimatedChunk(pygame.sprite.Sprite):
+    """Shows the current frame of a shared animation, so it needs no update itself"""
 
-    def animate(self, dt) -> None:
-        self.frame_index += 5 * dt
-        if self.frame_index >= len(self.frames):
-            self.frame_index = 0
-        self.image = self.frames[int(self.frame_index)]
+    def __init__(
+        self, pos, frames: List[Surface], animation: Animation, groups, z: int
+    ) -> None:
+        super().__init__(groups)
+        self.frames = frames
+        self.animation = animation
+        self.rect = frames[0].get_rect(topleft=pos)
+        self.z = z
 
-    def update(self, dt):
-        self.animate(dt)
+    @property
+    def image(self) -> Surface:
+        return self.frames[self.animation.index]
 
 
 class WildFlower(Generic):
@@ -54,11 +52,16 @@ class WildFlower(Generic):
 
 class Particle(Generic):
     def __init__(
-        self, pos, surf: Surface, groups, z: int, duration: float = 200
+        self,
+        pos,
+        surf: Surface,
+        groups,
+        z: int,
+        scheduler: Scheduler,
+        duration: float = 200,
     ) -> None:
         super().__init__(pos, surf, groups, z)
-        self.start_time = pygame.time.get_ticks()
-        self.duration = duration
+        scheduler.schedule(duration, self.kill)
 
         # white surface
         mask_surf = pygame.mask.from_surface(self.image)  # type: ignore
@@ -66,33 +69,30 @@ class Particle(Generic):
         new_surf.set_colorkey((0, 0, 0))
         self.image = new_surf
 
-    def update(self, dt) -> None:
-        current_time = pygame.time.get_ticks()
-        if current_time - self.start_time > self.duration:
-            self.kill()
-
 
 class Tree(Generic):
-    def __init__(self, pos, surf: Surface, groups, name: str, player_add) -> None:
+    def __init__(
+        self, pos, surf: Surface, groups, name: str, player_add, scheduler: Scheduler
+    ) -> None:
         super().__init__(pos, surf, groups, LAYERS["main"])
+        # the camera group, which also holds the apples and particles of the tree
+        self.all_sprites = groups[0]
 
         # tree attributes
         self.health = 5
         self.alive = True  # type: ignore
-        self.stump_surf = pygame.image.load(
+        self.stump_surf = assets.image(
             f'./graphics/stumps/{"small" if name == "Small" else "large"}.png'
-        ).convert_alpha()
+        )
 
         # apples
-        self.apples_surf = pygame.image.load("./graphics/fruit/apple.png")
+        self.apples_surf = assets.image("./graphics/fruit/apple.png")
         self.apple_pos = APPLE_POS[name]
         self.apple_sprites = pygame.sprite.Group()
         self.create_fruit()
 
-        # sound
-        self.axe_sound = pygame.mixer.Sound("./audio/axe.mp3")
-
         self.player_add = player_add
+        self.scheduler = scheduler
 
     def damage(self):
         # damaging the tree
@@ -101,23 +101,35 @@ class Tree(Generic):
         # remove an apple
         if len(self.apple_sprites.sprites()) > 0:
             random_apple = choice(self.apple_sprites.sprites())
-            Particle(pos=random_apple.rect.topleft, surf=random_apple.image, groups=self.groups()[0], z=LAYERS["fruit"])  # type: ignore
+            Particle(
+                pos=random_apple.rect.topleft,  # type: ignore
+                surf=random_apple.image,
+                groups=self.all_sprites,
+                z=LAYERS["fruit"],
+                scheduler=self.scheduler,
+            )
             self.player_add("apple")
             random_apple.kill()
 
+        self.check_death()
+
     def check_death(self):
-        if self.health <= 0:
-            Particle(pos=self.rect.topleft, surf=self.image, groups=self.groups()[0], z=LAYERS["fruit"], duration=300)  # type: ignore
+        if self.alive and self.health <= 0:
+            Particle(
+                pos=self.rect.topleft,  # type: ignore
+                surf=self.image,
+                groups=self.all_sprites,
+                z=LAYERS["fruit"],
+                scheduler=self.scheduler,
+                duration=300,
+            )
             self.image = self.stump_surf
             self.rect = self.image.get_rect(midbottom=self.rect.midbottom)  # type: ignore
             self.hitbox = self.rect.copy().inflate(-10, -self.rect.height * 0.6)
+            refresh_groups(self)
             self.alive = False  # type: ignore
             self.player_add("wood")
 
-    def update(self, dt) -> None:
-        if self.alive:
-            self.check_death()
-
     def create_fruit(self):
         for pos in self.apple_pos:
             if randint(0, 10) < 2:
@@ -126,6 +138,6 @@ class Tree(Generic):
                 Generic(
                     (x, y),
                     self.apples_surf,
-                    [self.apple_sprites, self.groups()[0]],
+                    [self.apple_sprites, self.all_sprites],
                     LAYERS["fruit"],
                 )
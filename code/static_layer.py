@@ -0,0 +1,95 @@
+from collections import defaultdict
+import pygame
+from pygame.sprite import AbstractGroup
+from pygame.surface import Surface
+from settings import *
+from sprites import AnimatedChunk, Generic
+from animation import Animation
+
+
+class StaticLayer:
+    """Bakes the static tiles of one render layer into a few chunk surfaces.
+
+    Tiles are blitted in the order the camera would have drawn them as separate sprites,
+    (centery, insertion order), so the baked chunks look the same while costing one blit
+    per visible chunk. Only layers that are never depth-sorted against moving sprites
+    can be baked.
+    """
+
+    def __init__(self, chunk_size: int = STATIC_CHUNK_SIZE) -> None:
+        self.chunk_size = chunk_size
+        self.tiles: list[tuple[pygame.Rect, Surface]] = []
+
+    def add(self, pos: tuple[int, int], surf: Surface) -> None:
+        self.tiles.append((surf.get_rect(topleft=pos), surf))
+
+    def bake_chunks(self) -> dict[tuple[int, int], tuple[pygame.Rect, Surface]]:
+        """Return the area and surface of every chunk, cropped to the tiles it holds"""
+        size = self.chunk_size
+        chunk_tiles: dict[tuple[int, int], list[tuple[pygame.Rect, Surface]]] = (
+            defaultdict(list)
+        )
+        for rect, surf in sorted(self.tiles, key=lambda tile: tile[0].centery):
+            for chunk_y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                for chunk_x in range(rect.left // size, (rect.right - 1) // size + 1):
+                    chunk_tiles[(chunk_x, chunk_y)].append((rect, surf))
+
+        chunks = {}
+        for (chunk_x, chunk_y), tiles in chunk_tiles.items():
+            bounds = tiles[0][0].unionall([rect for rect, _ in tiles[1:]])
+            area = pygame.Rect(chunk_x * size, chunk_y * size, size, size).clip(bounds)
+            chunk = pygame.Surface(area.size, pygame.SRCALPHA)
+            for rect, surf in tiles:
+                chunk.blit(surf, (rect.x - area.x, rect.y - area.y))
+            chunks[(chunk_x, chunk_y)] = (area, chunk.convert_alpha())
+        return chunks
+
+    def bake(
+        self, groups: AbstractGroup | list[AbstractGroup], z: int
+    ) -> list[Generic]:
+        """Create one sprite per chunk that holds at least one tile"""
+        return [
+            Generic(area.topleft, chunk, groups, z)
+            for area, chunk in self.bake_chunks().values()
+        ]
+
+
+class AnimatedLayer:
+    """Bakes tiles that share one animation into chunks with a surface per frame.
+
+    Every frame is baked like a StaticLayer, so a whole lake is one blit per visible
+    chunk and the chunks flip frames with the shared animation.
+    """
+
+    def __init__(self, chunk_size: int = STATIC_CHUNK_SIZE) -> None:
+        self.chunk_size = chunk_size
+        self.tiles: list[tuple[tuple[int, int], list[Surface]]] = []
+
+    def add(self, pos: tuple[int, int], frames: list[Surface]) -> None:
+        self.tiles.append((pos, frames))
+
+    def bake(
+        self,
+        groups: AbstractGroup | list[AbstractGroup],
+        z: int,
+        animation: Animation,
+    ) -> list[AnimatedChunk]:
+        """Create one sprite per chunk that holds at least one tile"""
+        frame_chunks = []
+        for frame_index in range(animation.frame_count):
+            frame_layer = StaticLayer(self.chunk_size)
+            for pos, frames in self.tiles:
+                frame_layer.add(pos, frames[frame_index])
+            frame_chunks.append(frame_layer.bake_chunks())
+
+        # every frame has the same tiles, so its chunks cover the same areas
+        return [
+            AnimatedChunk(
+                area.topleft,
+                [chunks[coord][1] for chunks in frame_chunks],
+                animation,
+                groups,
+                z,
+            )
+            for coord, (area, _) in frame_chunks[0].items()
+        ]
@@ -1,12 +1,20 @@
 from os import walk
+from typing import Callable
 import pygame
 
 
-def import_folder(path: str) -> list[pygame.Surface]:
+def load_image(path: str) -> pygame.Surface:
+    return pygame.image.load(path).convert_alpha()
+
+
+def import_folder(
+    path: str, load: Callable[[str], pygame.Surface] = load_image
+) -> list[pygame.Surface]:
     """Import all images within a directory and return them as a list of Pygame surfaces
 
     Args:
         path (str): path to directory
+        load (Callable[[str], pygame.Surface]): loader called with the path of an image
 
     Returns:
         list[pygame.Surface]: list of images loaded as Pygame Surface
@@ -17,17 +25,20 @@ def import_folder(path: str) -> list[pygame.Surface]:
     for _, _, img_files in walk(path):
         for image in img_files:
             full_path = path + "/" + image
-            image_surf = pygame.image.load(full_path).convert_alpha()
+            image_surf = load(full_path)
             surface_list.append(image_surf)
 
     return surface_list
 
 
-def import_folder_dict(path: str) -> dict[str, pygame.Surface]:
+def import_folder_dict(
+    path: str, load: Callable[[str], pygame.Surface] = load_image
+) -> dict[str, pygame.Surface]:
     """Import all images within a directory and return them as a dict of filenames and Pygame surfaces
 
     Args:
         path (str): path to directory
+        load (Callable[[str], pygame.Surface]): loader called with the path of an image
 
     Returns:
         dict[str, pygame.Surface]: dict of images loaded as Pygame Surface with filename without extension as key
@@ -37,7 +48,7 @@ def import_folder_dict(path: str) -> dict[str, pygame.Surface]:
     for _, _, img_files in walk(path):
         for image in img_files:
             full_path = path + "/" + image
-            image_surf = pygame.image.load(full_path).convert_alpha()
+            image_surf = load(full_path)
             surface_dict[image.split(".")[0]] = image_surf
 
     return surface_dict
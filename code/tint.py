@@ -0,0 +1,77 @@
+import pygame
+from settings import *
+
+Color = tuple[int, int, int]
+WHITE: Color = (255, 255, 255)
+
+
+def multiply_colors(colors) -> Color:
+    red, green, blue = WHITE
+    for color in colors:
+        red = red * color[0] // 255
+        green = green * color[1] // 255
+        blue = blue * color[2] // 255
+    return red, green, blue
+
+
+class Tint:
+    """Multiplies the frame by the colours of the sky and the sleep transition.
+
+    Every source sets its colour each frame and the product of all colours is applied in
+    one multiply pass at the end of the frame. The tint surface is only refilled when
+    the colour changes and the pass is skipped while the colour is white.
+
+    In baked mode, bakeable sources (the sky) are multiplied into the images the camera
+    draws instead, through a cache of tinted copies that is dropped when their colour
+    changes. The sky changes slowly and then settles, so most frames need no full-screen
+    pass; the interface is drawn untinted in this mode.
+    """
+
+    def __init__(self, baked: bool = TINT_BAKED) -> None:
+        self.display_surface = pygame.display.get_surface()
+        self.baked = baked
+
+        # colours by source
+        self.colors: dict[str, Color] = {}
+        self.baked_colors: dict[str, Color] = {}
+
+        # screen pass
+        self.surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.surf_color = WHITE
+
+        # baked images
+        self.baked_color = WHITE
+        self.baked_surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.tinted_images: dict[pygame.Surface, pygame.Surface] = {}
+
+    def set_color(self, source: str, color, bakeable: bool = False) -> None:
+        color = (int(color[0]), int(color[1]), int(color[2]))
+        if not (bakeable and self.baked):
+            self.colors[source] = color
+        elif self.baked_colors.get(source) != color:
+            self.baked_colors[source] = color
+            self.baked_color = multiply_colors(self.baked_colors.values())
+            self.baked_surf.fill(self.baked_color)
+            self.tinted_images.clear()
+
+    def get_image(self, image: pygame.Surface) -> pygame.Surface:
+        """The image with the baked colour applied"""
+        if self.baked_color == WHITE:
+            return image
+        tinted = self.tinted_images.get(image)
+        if tinted is None:
+            tinted = image.copy()
+            tinted.blit(self.baked_surf, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+            self.tinted_images[image] = tinted
+        return tinted
+
+    def apply(self) -> None:
+        color = multiply_colors(self.colors.values())
+        if color == WHITE:
+            return
+        if color != self.surf_color:
+            self.surf.fill(color)
+            self.surf_color = color
+        self.display_surface.blit(
+            self.surf, (0, 0), special_flags=pygame.BLEND_RGBA_MULT
+        )
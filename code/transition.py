@@ -1,17 +1,16 @@
-import pygame
 from player import Player
 from settings import *
+from tint import Tint
 
 
 class Transition:
-    def __init__(self, reset, player: Player) -> None:
+    def __init__(self, reset, player: Player, tint: Tint) -> None:
         # setup
-        self.display_surface = pygame.display.get_surface()
         self.reset = reset
         self.player = player
 
-        # overlay image
-        self.image = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # overlay colour
+        self.tint = tint
         self.color = 255
         self.speed = -2
 
@@ -28,7 +27,4 @@ class Transition:
             self.player.sleep = False
             # 3. set the speed to -2 at the end of the transition
             self.speed *= -1
-        self.image.fill((self.color, self.color, self.color))
-        self.display_surface.blit(
-            self.image, (0, 0), special_flags=pygame.BLEND_RGBA_MULT
-        )
+        self.tint.set_color("transition", (self.color, self.color, self.color))